@@ -0,0 +1,35 @@
+"""add_chat_history_session_id_index
+
+Revision ID: 0b9e4d7a3c16
+Revises: f1a6d3b8c527
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e4d7a3c16'
+down_revision: Union[str, None] = 'f1a6d3b8c527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_chat_history_session_id_id', 'chat_history', ['session_id', 'id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_chat_history_session_id', table_name='chat_history',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_chat_history_session_id', 'chat_history', ['session_id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_chat_history_session_id_id', table_name='chat_history',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,30 @@
+"""add_composite_lookup_indexes
+
+Revision ID: 4c1e9a7b2d30
+Revises: 8bc4288eab7a
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e9a7b2d30'
+down_revision: Union[str, None] = '8bc4288eab7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_profiles_user_id_id', 'user_profiles', ['user_id', 'id'], unique=False)
+    op.create_index('ix_chat_history_user_id_session_id_created_at', 'chat_history', ['user_id', 'session_id', 'created_at'], unique=False)
+    op.create_index('ix_food_logs_user_id_date', 'food_logs', ['user_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_food_logs_user_id_date', table_name='food_logs')
+    op.drop_index('ix_chat_history_user_id_session_id_created_at', table_name='chat_history')
+    op.drop_index('ix_user_profiles_user_id_id', table_name='user_profiles')
@@ -0,0 +1,36 @@
+"""add_meal_plan_history_profile_created_index
+
+Revision ID: 5d2c8e1f9a47
+Revises: 0b9e4d7a3c16
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c8e1f9a47'
+down_revision: Union[str, None] = '0b9e4d7a3c16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meal_plan_history_profile_created', 'meal_plan_history',
+                        ['user_profile_id', 'created_at'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_meal_plan_history_user_profile_id', table_name='meal_plan_history',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meal_plan_history_user_profile_id', 'meal_plan_history', ['user_profile_id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_meal_plan_history_profile_created', table_name='meal_plan_history',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,35 @@
+"""add_compressed_chat_content
+
+Revision ID: 7d2f5b8e1a94
+Revises: 4c1e9a7b2d30
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f5b8e1a94'
+down_revision: Union[str, None] = '4c1e9a7b2d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_history', sa.Column('content_compressed', sa.LargeBinary(), nullable=True))
+    # Large messages keep content NULL and store zstd bytes in content_compressed
+    op.alter_column('chat_history', 'content',
+               existing_type=sa.Text(),
+               nullable=True)
+
+
+def downgrade() -> None:
+    # Compressed rows cannot be restored in SQL; blank them so NOT NULL holds
+    op.execute("UPDATE chat_history SET content = '' WHERE content IS NULL")
+    op.alter_column('chat_history', 'content',
+               existing_type=sa.Text(),
+               nullable=False)
+    op.drop_column('chat_history', 'content_compressed')
@@ -0,0 +1,36 @@
+"""add_workout_history_profile_created_index
+
+Revision ID: a83c6e0f5b17
+Revises: 7d2f5b8e1a94
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83c6e0f5b17'
+down_revision: Union[str, None] = '7d2f5b8e1a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_wph_profile_created', 'workout_plan_history',
+                        ['user_profile_id', sa.text('created_at DESC')],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_workout_plan_history_user_profile_id', table_name='workout_plan_history',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_workout_plan_history_user_profile_id', 'workout_plan_history', ['user_profile_id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_wph_profile_created', table_name='workout_plan_history',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""compress_workout_plan_jsonb
+
+Revision ID: b5d1f2a9c604
+Revises: a83c6e0f5b17
+Create Date: 2026-10-16 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f2a9c604'
+down_revision: Union[str, None] = 'a83c6e0f5b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB_COLUMNS = {
+    'workout_plans': ['weekly_schedule', 'progression_guidelines', 'cardio_recommendations'],
+    'workout_plan_history': ['workout_plan_snapshot'],
+}
+
+
+def upgrade() -> None:
+    # Push the repetitive plan JSON out to (compressed) TOAST sooner
+    supports_lz4 = op.get_bind().dialect.server_version_info >= (14,)
+    for table, columns in JSONB_COLUMNS.items():
+        op.execute(f"ALTER TABLE {table} SET (toast_tuple_target = 128)")
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET STORAGE EXTENDED")
+            if supports_lz4:
+                # Applies to newly written values; existing rows keep pglz until rewritten
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    supports_lz4 = op.get_bind().dialect.server_version_info >= (14,)
+    for table, columns in JSONB_COLUMNS.items():
+        op.execute(f"ALTER TABLE {table} RESET (toast_tuple_target)")
+        if supports_lz4:
+            for column in columns:
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION DEFAULT")
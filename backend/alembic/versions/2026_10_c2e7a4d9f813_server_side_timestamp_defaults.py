@@ -0,0 +1,64 @@
+"""server_side_timestamp_defaults
+
+Revision ID: c2e7a4d9f813
+Revises: b5d1f2a9c604
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e7a4d9f813'
+down_revision: Union[str, None] = 'b5d1f2a9c604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns that get DEFAULT now(); existing naive values were written as UTC
+SERVER_DEFAULT_COLUMNS = {
+    'user_profiles': ['created_at', 'updated_at'],
+    'workout_plans': ['created_at', 'updated_at'],
+    'workout_plan_history': ['created_at'],
+    'workout_preferences': ['created_at', 'updated_at'],
+}
+# Promoted to timestamptz but keeps its Python-side default
+TIMESTAMPTZ_ONLY_COLUMNS = {
+    'user_profiles': ['last_physical_update'],
+}
+
+
+def _columns(mapping):
+    for table, columns in mapping.items():
+        for column in columns:
+            yield table, column
+
+
+def upgrade() -> None:
+    for table, column in _columns(SERVER_DEFAULT_COLUMNS):
+        op.alter_column(table, column,
+                   existing_type=sa.DateTime(),
+                   type_=sa.DateTime(timezone=True),
+                   postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                   server_default=sa.text('now()'))
+    for table, column in _columns(TIMESTAMPTZ_ONLY_COLUMNS):
+        op.alter_column(table, column,
+                   existing_type=sa.DateTime(),
+                   type_=sa.DateTime(timezone=True),
+                   postgresql_using=f"{column} AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    for table, column in _columns(TIMESTAMPTZ_ONLY_COLUMNS):
+        op.alter_column(table, column,
+                   existing_type=sa.DateTime(timezone=True),
+                   type_=sa.DateTime(),
+                   postgresql_using=f"{column} AT TIME ZONE 'UTC'")
+    for table, column in _columns(SERVER_DEFAULT_COLUMNS):
+        op.alter_column(table, column,
+                   existing_type=sa.DateTime(timezone=True),
+                   type_=sa.DateTime(),
+                   postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                   server_default=None)
@@ -0,0 +1,50 @@
+"""add_health_restriction_code
+
+Revision ID: d4f8a1c6e2b9
+Revises: c2e7a4d9f813
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a1c6e2b9'
+down_revision: Union[str, None] = 'c2e7a4d9f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+hr_code = sa.Enum('none', 'knee', 'back', 'shoulder', 'other', name='hr_code')
+
+
+def upgrade() -> None:
+    hr_code.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        'workout_preferences',
+        sa.Column('health_restriction_code', hr_code, server_default='none', nullable=False)
+    )
+
+    # Backfill with the same rules as models.workout_preferences.classify_health_restriction
+    op.execute("""
+        UPDATE workout_preferences SET health_restriction_code = CASE
+            WHEN coalesce(trim(lower(health_restrictions)), '') IN ('', 'none', 'no', 'n/a', 'na') THEN 'none'
+            WHEN lower(health_restrictions) LIKE '%knee%' THEN 'knee'
+            WHEN lower(health_restrictions) LIKE '%back%' THEN 'back'
+            WHEN lower(health_restrictions) LIKE '%shoulder%' THEN 'shoulder'
+            ELSE 'other'
+        END::hr_code
+    """)
+
+    op.create_index(
+        'ix_workout_preferences_health_restriction_code',
+        'workout_preferences', ['health_restriction_code']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workout_preferences_health_restriction_code', table_name='workout_preferences')
+    op.drop_column('workout_preferences', 'health_restriction_code')
+    hr_code.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,88 @@
+"""partition_workout_plan_history
+
+Revision ID: e7b3c9d2a415
+Revises: d4f8a1c6e2b9
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9d2a415'
+down_revision: Union[str, None] = 'd4f8a1c6e2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with app.models.workout_plan_history.WPH_PARTITIONS
+PARTITIONS = 32
+COLUMNS = "id, user_profile_id, workout_plan_snapshot, created_at"
+
+
+def _move_aside() -> None:
+    # Free the names the new table needs; the id sequence carries over
+    op.execute("ALTER TABLE workout_plan_history RENAME TO workout_plan_history_old")
+    op.execute("ALTER TABLE workout_plan_history_old RENAME CONSTRAINT workout_plan_history_pkey TO workout_plan_history_old_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_wph_profile_created")
+    op.execute("DROP INDEX IF EXISTS ix_workout_plan_history_id")
+    op.execute("ALTER SEQUENCE workout_plan_history_id_seq OWNED BY NONE")
+
+
+def _finish() -> None:
+    op.execute(f"INSERT INTO workout_plan_history ({COLUMNS}) SELECT {COLUMNS} FROM workout_plan_history_old")
+    op.drop_table('workout_plan_history_old')
+    op.execute("ALTER SEQUENCE workout_plan_history_id_seq OWNED BY workout_plan_history.id")
+    op.create_index('ix_workout_plan_history_id', 'workout_plan_history', ['id'])
+    op.create_index(
+        'ix_wph_profile_created', 'workout_plan_history',
+        ['user_profile_id', sa.text('created_at DESC')]
+    )
+
+
+def _create_table(partition_by: str = "") -> None:
+    # The partition key has to be part of the primary key
+    primary_key = "(id, user_profile_id)" if partition_by else "(id)"
+    op.execute(f"""
+        CREATE TABLE workout_plan_history (
+            id INTEGER NOT NULL DEFAULT nextval('workout_plan_history_id_seq'),
+            user_profile_id INTEGER NOT NULL REFERENCES user_profiles (id) ON DELETE CASCADE,
+            workout_plan_snapshot JSONB NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            PRIMARY KEY {primary_key}
+        ) {partition_by}
+    """)
+    op.execute(
+        "COMMENT ON COLUMN workout_plan_history.workout_plan_snapshot "
+        "IS 'Snapshot of the generated workout plan (schedule object)'"
+    )
+
+
+def upgrade() -> None:
+    _move_aside()
+    _create_table("PARTITION BY HASH (user_profile_id)")
+
+    # Storage parameters can only be set on the leaf partitions
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE workout_plan_history_p{remainder:02d} PARTITION OF workout_plan_history "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder}) "
+            f"WITH (toast_tuple_target = 128)"
+        )
+    if op.get_bind().dialect.server_version_info >= (14,):
+        op.execute("ALTER TABLE workout_plan_history ALTER COLUMN workout_plan_snapshot SET COMPRESSION lz4")
+
+    _finish()
+
+
+def downgrade() -> None:
+    _move_aside()
+    _create_table()
+    op.execute("ALTER TABLE workout_plan_history SET (toast_tuple_target = 128)")
+    if op.get_bind().dialect.server_version_info >= (14,):
+        op.execute("ALTER TABLE workout_plan_history ALTER COLUMN workout_plan_snapshot SET COMPRESSION lz4")
+
+    # Dropping the partitioned parent drops its partitions as well
+    _finish()
@@ -0,0 +1,61 @@
+"""add_timezones_lookup_table
+
+Revision ID: f1a6d3b8c527
+Revises: e7b3c9d2a415
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pytz
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6d3b8c527'
+down_revision: Union[str, None] = 'e7b3c9d2a415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UTC_TIMEZONE_ID = 1
+
+
+def upgrade() -> None:
+    timezones = op.create_table(
+        'timezones',
+        sa.Column('id', sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    names = ["UTC"] + sorted(set(pytz.all_timezones) - {"UTC"})
+    op.bulk_insert(timezones, [{'id': i, 'name': name} for i, name in enumerate(names, start=UTC_TIMEZONE_ID)])
+
+    op.add_column(
+        'user_profiles',
+        sa.Column('timezone_id', sa.SmallInteger(), server_default=str(UTC_TIMEZONE_ID), nullable=False)
+    )
+    # Unknown or empty names stay on the UTC default, matching how they were read before
+    op.execute("""
+        UPDATE user_profiles p SET timezone_id = t.id
+        FROM timezones t WHERE t.name = p.timezone
+    """)
+    op.create_foreign_key(
+        'user_profiles_timezone_id_fkey', 'user_profiles', 'timezones', ['timezone_id'], ['id']
+    )
+    op.drop_column('user_profiles', 'timezone')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'user_profiles',
+        sa.Column('timezone', sa.String(length=50), nullable=True)
+    )
+    op.execute("""
+        UPDATE user_profiles p SET timezone = t.name
+        FROM timezones t WHERE t.id = p.timezone_id
+    """)
+    op.drop_constraint('user_profiles_timezone_id_fkey', 'user_profiles', type_='foreignkey')
+    op.drop_column('user_profiles', 'timezone_id')
+    op.drop_table('timezones')
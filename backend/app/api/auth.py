@@ -3,29 +3,47 @@ from fastapi.security import APIKeyCookie
 from jose import JWTError, jwt
 from config import SECRET_KEY,ALGORITHM
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models.user import User
+from app.crud.user import get_user_by_email_async
 
 oauth2_scheme = APIKeyCookie(name="access_token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Session expired. Please re-login.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _email_from_token(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
         # This handles ExpiredSignatureError and other JWT issues
-        raise credentials_exception
+        raise _credentials_exception()
+    return email
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    email = _email_from_token(token)
 
     # Check if user still exists in DB
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
         
-    return user
\ No newline at end of file
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """Same as get_current_user, for read-only `async def` endpoints."""
+    email = _email_from_token(token)
+
+    user = await get_user_by_email_async(db, email)
+    if user is None:
+        raise _credentials_exception()
+
+    return user
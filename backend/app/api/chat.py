@@ -1,20 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.database import get_db
-from app.services.ai_coach import FitnessCoachService
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy import desc, text
+from app.database import get_db, SessionLocal
 from app.api.auth import get_current_user
 from app.models.chat import ChatHistory, ChatSession
 from app.services.llm_service import generate_chat_title, generate_refined_chat_title, LANGFUSE_ENABLED
 from app.services.chat_memory_service import ChatMemoryService
 from datetime import datetime
+import json
 import sys
 
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing - creates root trace for chat requests
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator fallback
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
@@ -37,6 +40,108 @@ class SessionSchema(BaseModel):
     title: str
     last_active: datetime
 
+def _get_or_create_chat_session(db: Session, user_id: int, session_id: str):
+    """Returns (chat_session, is_new_session); 403 if the session id belongs to another user."""
+    # Check if session exists globally to prevent UniqueViolation
+    chat_session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+    
+    if chat_session:
+        # Verify ownership
+        if chat_session.user_id != user_id:
+            print(f"[Chat API] Security Alert: User {user_id} tried to access Session {session_id} belonging to User {chat_session.user_id}")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="This session ID belongs to another user. Please start a new chat."
+            )
+        return chat_session, False
+
+    # Create new session
+    chat_session = ChatSession(
+        user_id=user_id,
+        session_id=session_id,
+        title="New Chat"
+    )
+    db.add(chat_session)
+    db.commit()
+    db.refresh(chat_session)
+    print(f"[Chat API] Created new session: {session_id}")
+    return chat_session, True
+
+def _name_new_session(db: Session, chat_session: ChatSession, message: str, should_generate_title: bool):
+    """If this session is still unnamed, generate a title immediately so the UI can display it."""
+    if not (should_generate_title and chat_session.title == "New Chat"):
+        return
+    try:
+        generated_title = generate_chat_title(message)
+        if generated_title:
+            chat_session.title = generated_title
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[Chat API] Immediate title generation failed for {chat_session.session_id}: {e}")
+
+def _queue_chat_turn(background_tasks: BackgroundTasks, chat_session: ChatSession, user_id: int, message: str, response_data: dict):
+    """
+    Write-behind for the turn: the coach has already updated the Redis notepad, so the
+    Postgres rows are written after the response is sent instead of on the request path.
+    """
+    background_tasks.add_task(
+        _persist_chat_turn,
+        chat_session.session_id,
+        user_id,
+        message,
+        response_data["content"],
+        response_data.get("custom_content"),
+        chat_session.title,
+    )
+
+def _persist_chat_turn(session_id: str, user_id: int, message: str, content: str, custom_content, session_title: str):
+    """Background task: persists the user + assistant rows and session timestamp in one commit, then refines the title."""
+    try:
+        with SessionLocal() as db_session:
+            # Chat rows can tolerate losing the last few ms on a crash; skip the WAL flush wait
+            db_session.execute(text("SET LOCAL synchronous_commit = off"))
+            db_session.add_all([
+                ChatHistory(
+                    user_id=user_id,
+                    role="user",
+                    content=message,
+                    session_id=session_id
+                ),
+                ChatHistory(
+                    user_id=user_id,
+                    role="assistant",
+                    content=content,
+                    custom_content=custom_content,
+                    session_id=session_id
+                ),
+            ])
+            # Update session timestamp
+            db_session.query(ChatSession).filter(ChatSession.session_id == session_id).update(
+                {ChatSession.updated_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db_session.commit()
+            message_count = db_session.query(ChatHistory).filter(ChatHistory.session_id == session_id).count()
+    except Exception as e:
+        print(f"[Chat API] Failed to persist turn for {session_id}: {e}")
+        return
+
+    # Generate Title (Dynamic Refinement) based on how far the session has come
+    trigger_mode = None
+    if message_count <= 3 and session_title == "New Chat":
+        # Initial title generation for new sessions
+        trigger_mode = "initial"
+    elif 4 <= message_count <= 5:
+        # Progressive refinement for questions 4-5
+        trigger_mode = "progressive"
+    elif message_count == 6:
+        # Final comprehensive summary after 6 questions
+        trigger_mode = "comprehensive"
+        
+    if trigger_mode:
+        print(f"[Chat API] Triggering '{trigger_mode}' title generation for {session_id}")
+        update_session_title(session_id, user_id, message, trigger_mode)
+
 @router.post("/chat", response_model=ChatResponse)
 @observe(name="chat_with_coach")
 async def chat_with_coach(
@@ -54,31 +159,7 @@ async def chat_with_coach(
     session_id = request.session_id
     
     # 1. Manage Session
-    # Check if session exists globally to prevent UniqueViolation
-    chat_session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-    
-    is_new_session = False
-    
-    if chat_session:
-        # Verify ownership
-        if chat_session.user_id != user_id:
-            print(f"[Chat API] Security Alert: User {user_id} tried to access Session {session_id} belonging to User {chat_session.user_id}")
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="This session ID belongs to another user. Please start a new chat."
-            )
-    else:
-        # Create new session
-        is_new_session = True
-        chat_session = ChatSession(
-            user_id=user_id,
-            session_id=session_id,
-            title="New Chat"
-        )
-        db.add(chat_session)
-        db.commit()
-        db.refresh(chat_session)
-        print(f"[Chat API] Created new session: {session_id}")
+    chat_session, is_new_session = _get_or_create_chat_session(db, user_id, session_id)
     
     # Auto-generate title if it's "New Chat" or newly created
     should_generate_title = is_new_session or chat_session.title == "New Chat"
@@ -90,57 +171,15 @@ async def chat_with_coach(
     session_key = f"user_{user_id}_{session_id}"
     
     try:
+        # Imported on first chat request: pulls in LangGraph + guardrails
+        from app.services.ai_coach import FitnessCoachService
         coach = FitnessCoachService(db, session_id=session_key)
         # Updated signature: user_message, user_id, session_id
         response_data = await coach.get_response(request.message, user_id, session_key)
         
-        # 3. Save History
-        db.add(ChatHistory(
-            user_id=user_id,
-            role="user",
-            content=request.message,
-            session_id=session_id
-        ))
-        db.add(ChatHistory(
-            user_id=user_id,
-            role="assistant",
-            content=response_data["content"],
-            custom_content=response_data.get("custom_content"),
-            session_id=session_id
-        ))
-
-        # If this session is still unnamed, generate a title immediately so the UI can display it
-        if should_generate_title and chat_session.title == "New Chat":
-            try:
-                generated_title = generate_chat_title(request.message)
-                if generated_title:
-                    chat_session.title = generated_title
-            except Exception as e:
-                print(f"[Chat API] Immediate title generation failed for {session_id}: {e}")
-        
-        # Update session timestamp
-        chat_session.updated_at = datetime.utcnow()
-        
-        db.commit()
-        
-        # 4. Generate Title in Background (Dynamic Refinement)
-        # Generate title based on content analysis with progressive refinement
-        message_count = db.query(ChatHistory).filter(ChatHistory.session_id == session_id).count()
-        
-        trigger_mode = None
-        if message_count <= 3 and chat_session.title == "New Chat":
-            # Initial title generation for new sessions
-            trigger_mode = "initial"
-        elif 4 <= message_count <= 5:
-            # Progressive refinement for questions 4-5
-            trigger_mode = "progressive"
-        elif message_count == 6:
-            # Final comprehensive summary after 6 questions
-            trigger_mode = "comprehensive"
-            
-        if trigger_mode:
-            print(f"[Chat API] Triggering '{trigger_mode}' title generation for {session_id}")
-            background_tasks.add_task(update_session_title, session_id, user_id, request.message, trigger_mode)
+        # 3. Name a new session now; history rows + title refinement are written after the response
+        _name_new_session(db, chat_session, request.message, should_generate_title)
+        _queue_chat_turn(background_tasks, chat_session, user_id, request.message, response_data)
         
         return ChatResponse(
             response=response_data["content"], 
@@ -157,11 +196,54 @@ async def chat_with_coach(
             detail="The coach is currently unavailable."
         )
 
+@router.post("/chat/stream")
+@observe(name="chat_with_coach_stream")
+async def chat_with_coach_stream(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Streaming /chat (Server-Sent Events).
+    Emits `{"delta": ...}` events while the answer is generated, then one
+    `{"done": true, "response", "source", "session_id", "title"}` event once the turn is saved.
+    """
+    user_id = current_user.id
+    session_id = request.session_id
+    chat_session, is_new_session = _get_or_create_chat_session(db, user_id, session_id)
+    should_generate_title = is_new_session or chat_session.title == "New Chat"
+    session_key = f"user_{user_id}_{session_id}"
+
+    from app.services.ai_coach import FitnessCoachService
+    coach = FitnessCoachService(db, session_id=session_key)
+
+    async def event_stream():
+        try:
+            async for kind, payload in coach.get_response_stream(request.message, user_id, session_key):
+                if kind == "delta":
+                    yield f"data: {json.dumps({'delta': payload})}\n\n"
+                    continue
+
+                _name_new_session(db, chat_session, request.message, should_generate_title)
+                _queue_chat_turn(background_tasks, chat_session, user_id, request.message, payload)
+                yield "data: " + json.dumps({
+                    "done": True,
+                    "response": payload["content"],
+                    "source": payload["source"],
+                    "session_id": session_id,
+                    "title": chat_session.title
+                }) + "\n\n"
+        except Exception as e:
+            print(f"[Chat API] Stream Error: {e}")
+            db.rollback()
+            yield f"data: {json.dumps({'error': 'The coach is currently unavailable.'})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", background=background_tasks)
+
 def update_session_title(session_id: str, user_id: int, first_message: str, trigger_mode: str = "initial"):
     """Background task to generate and save chat title"""
     try:
-        from app.database import SessionLocal
-        
         with SessionLocal() as db_session:
              session = db_session.query(ChatSession).filter(
                  ChatSession.session_id == session_id,
@@ -182,14 +264,14 @@ def update_session_title(session_id: str, user_id: int, first_message: str, trig
              elif trigger_mode == "progressive":
                  # Progressive refinement for questions 4-5 - focus on latest content
                  from app.services.llm_service import generate_refined_chat_title
-                 latest_msgs = db_session.query(ChatHistory).filter(ChatHistory.session_id == session_id).order_by(ChatHistory.id.desc()).limit(3).all()
+                 latest_msgs = db_session.query(ChatHistory).filter(ChatHistory.session_id == session_id).options(undefer(ChatHistory.content_compressed)).order_by(ChatHistory.id.desc()).limit(3).all()
                  history = [{"role": m.role, "content": m.content} for m in latest_msgs[::-1]]  # Reverse for chronological
                  title = generate_refined_chat_title(history)
              
              elif trigger_mode == "comprehensive":
                  # Comprehensive summary after 6 questions - analyze full conversation
                  from app.services.llm_service import generate_comprehensive_chat_title
-                 all_msgs = db_session.query(ChatHistory).filter(ChatHistory.session_id == session_id).order_by(ChatHistory.id.asc()).all()
+                 all_msgs = db_session.query(ChatHistory).filter(ChatHistory.session_id == session_id).options(undefer(ChatHistory.content_compressed)).order_by(ChatHistory.id.asc()).all()
                  history = [{"role": m.role, "content": m.content} for m in all_msgs]
                  title = generate_comprehensive_chat_title(history)
 
@@ -216,7 +298,7 @@ def get_chat_history(
     history = db.query(ChatHistory).filter(
         ChatHistory.user_id == current_user.id,
         ChatHistory.session_id == session_id
-    ).order_by(ChatHistory.id.desc()).limit(50).all()
+    ).options(undefer(ChatHistory.content_compressed)).order_by(ChatHistory.id.desc()).limit(50).all()
     
     return [{"id": msg.id, "role": msg.role, "content": msg.content, "custom_content": msg.custom_content, "timestamp": msg.created_at} for msg in reversed(history)]
 
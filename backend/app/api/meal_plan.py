@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.meal_service import generate_meal_plan, restore_original_plan 
@@ -8,11 +9,14 @@ from app.models.meal_plan import MealPlan
 from app.models.user_profile import UserProfile
 from app.models.user import User
 from app.api.auth import get_current_user
+from app.services.stats_service import invalidate_user_context
 import sys
 
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator fallback
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
@@ -25,7 +29,7 @@ router = APIRouter(
 
 from app.models.tracking import FoodLog
 
-@router.post("/", response_model=MealPlanResponse)
+@router.post("/", response_model=MealPlanResponse, response_class=ORJSONResponse)
 @observe(name="generate_meal_plan")
 def generate_meal_plan_endpoint(
     request: MealPlanGenerateRequest = None,
@@ -46,9 +50,10 @@ def generate_meal_plan_endpoint(
     if not meal_plan:
         raise HTTPException(status_code=400, detail="Could not generate meal plan")
     
+    invalidate_user_context(current_user.id)
     return meal_plan
 
-@router.post("/regenerate", response_model=MealPlanResponse)
+@router.post("/regenerate", response_model=MealPlanResponse, response_class=ORJSONResponse)
 @observe(name="regenerate_meal_plan")
 def regenerate_meal_plan_endpoint(
     db: Session = Depends(get_db),
@@ -67,11 +72,12 @@ def regenerate_meal_plan_endpoint(
     if not meal_plan:
         raise HTTPException(status_code=400, detail="Could not regenerate meal plan")
         
+    invalidate_user_context(current_user.id)
     return meal_plan
 
 from app.crud.meal_plan import get_current_meal_plan_with_overrides
 
-@router.get("/current", response_model=MealPlanResponse)
+@router.get("/current", response_model=MealPlanResponse, response_class=ORJSONResponse)
 def get_current_meal(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -100,4 +106,5 @@ def reset_meal_plan_endpoint(
     result = restore_original_plan(db, current_user.id)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
+    invalidate_user_context(current_user.id)
     return result
@@ -7,6 +7,7 @@ from app.database import get_db
 from app.api.auth import get_current_user
 from app.models.user import User
 from app.models.tracking import FoodLog, WorkoutLog, WorkoutSession
+from app.services.stats_service import invalidate_user_context
 
 router = APIRouter()
 
@@ -113,6 +114,7 @@ def log_meal(
     
     db.add(new_log)
     db.commit()
+    invalidate_user_context(current_user.id)
     return {"message": "Meal logged successfully", "log_id": new_log.id}
 
 @router.post("/log-workout", status_code=status.HTTP_201_CREATED)
@@ -159,6 +161,7 @@ def log_workout(
 
     db.add(new_log)
     db.commit()
+    invalidate_user_context(current_user.id)
     return {"message": "Workout logged successfully", "log_id": new_log.id}
 
 @router.post("/log-workout-session", status_code=status.HTTP_201_CREATED)
@@ -195,6 +198,7 @@ def log_workout_session(
     if existing_session:
         existing_session.duration_minutes = request.duration_minutes
         db.commit()
+        invalidate_user_context(current_user.id)
         return {"message": "Workout session updated", "session_id": existing_session.id}
     else:
         # For new session, if created_at not provided, use local time
@@ -213,6 +217,7 @@ def log_workout_session(
             
         db.add(new_session)
         db.commit()
+        invalidate_user_context(current_user.id)
         return {"message": "Workout session logged", "session_id": new_session.id}
 
 @router.delete("/log-meal/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -230,6 +235,7 @@ def delete_meal_log(
     
     db.delete(log)
     db.commit()
+    invalidate_user_context(current_user.id)
     return None
 
 @router.delete("/daily-diet", status_code=status.HTTP_204_NO_CONTENT)
@@ -247,6 +253,7 @@ def delete_daily_diet_logs(
     ).delete()
     
     db.commit()
+    invalidate_user_context(current_user.id)
     return None
 
 @router.delete("/log-workout/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -264,6 +271,7 @@ def delete_workout_log(
     
     db.delete(log)
     db.commit()
+    invalidate_user_context(current_user.id)
     return None
 
 @router.delete("/daily-workout", status_code=status.HTTP_204_NO_CONTENT)
@@ -293,6 +301,7 @@ def delete_daily_workout_logs(
     ).delete()
     
     db.commit()
+    invalidate_user_context(current_user.id)
     return None
 
 @router.delete("/all-workout", status_code=status.HTTP_204_NO_CONTENT)
@@ -312,6 +321,7 @@ def delete_all_workout_logs(
     ).delete()
     
     db.commit()
+    invalidate_user_context(current_user.id)
     return None
 
 @router.get("/daily-diet", status_code=status.HTTP_200_OK)
@@ -10,6 +10,7 @@ from app.crud import user_profile as crud_user_profile
 from app.crud import user as crud_user
 from app.models.user import User
 from app.api.auth import get_current_user
+from app.services.stats_service import invalidate_user_context
 
 
 router = APIRouter(prefix="/user-profiles", tags=["user-profiles"])
@@ -34,6 +35,7 @@ def create_user_profile(
     
     try:
         new_profile = crud_user_profile.create_user_profile(db, profile, current_user.id)
+        invalidate_user_context(current_user.id)
         
         return new_profile
     except ValueError as e:
@@ -79,6 +81,7 @@ def update_my_profile(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Profile not found"
         )
+    invalidate_user_context(current_user.id)
     
     # Trigger meal plan generation automatically
     # print(f"Profile updated for user {current_user.email}. Regenerating meal plan...")
@@ -116,7 +119,12 @@ def update_profile_timezone(
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    profile.timezone = tz_data.timezone
+    from app.crud.timezone import get_timezone_id
+    timezone_id = get_timezone_id(db, tz_data.timezone)
+    if timezone_id is None:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz_data.timezone}")
+
+    profile.timezone_id = timezone_id
     db.commit()
     return {"message": "Timezone updated", "timezone": profile.timezone}
 
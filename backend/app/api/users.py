@@ -11,7 +11,7 @@ from app.database import get_db
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, UserSignupResponse
 from app.crud import user as crud_user
 from app.models.user import User
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_current_user_async
 
 AVATAR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "uploads", "avatars")
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -61,7 +61,7 @@ def signup(
 
 # GET - Get current user
 @router.get("/me", response_model=UserResponse)
-def read_me(current_user: User = Depends(get_current_user)):
+async def read_me(current_user: User = Depends(get_current_user_async)):
     return current_user
 
 # PUT - Update current user
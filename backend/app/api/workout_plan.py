@@ -1,15 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.schemas.workout_plan import WorkoutPlanRequest, WorkoutPlanResponse
 from app.services.workout_service import generate_workout_plan
-from app.api.auth import get_current_user
+from app.services.stats_service import invalidate_user_context
+from app.api.auth import get_current_user, get_current_user_async
 from datetime import date
 import sys
 
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator fallback
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
@@ -46,6 +52,7 @@ def generate_plan_endpoint(
         if not plan:
             raise HTTPException(status_code=500, detail="Failed to generate workout plan")
             
+        invalidate_user_context(current_user.id)
         return plan
         
     except ValueError as ve:
@@ -55,24 +62,27 @@ def generate_plan_endpoint(
         # Return generic error message to client, log the specific error
         raise HTTPException(status_code=500, detail="Failed to generate workout plan")
 
-@router.get("/current", response_model=WorkoutPlanResponse)
-def get_current_workout(
+@router.get("/current", response_model=WorkoutPlanResponse, response_class=ORJSONResponse)
+async def get_current_workout(
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    async_db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     import traceback
-    from app.crud.workout_plan import get_current_workout_plan
+    from app.crud.workout_plan import get_current_workout_plan_async
     from app.services.feast_mode_manager import FeastModeManager
     
-    plan = get_current_workout_plan(db, current_user.id)
+    plan = await get_current_workout_plan_async(async_db, current_user.id)
     if not plan:
         raise HTTPException(status_code=404, detail="Workout plan not found")
 
-    # Inject Feast Mode Workout if active
+    # Inject Feast Mode Workout if active (FeastModeManager is sync, keep it off the event loop)
     try:
         feast_manager = FeastModeManager(db)
         if plan.weekly_schedule:
-             updated_schedule = feast_manager.inject_feast_workout_into_plan(current_user.id, plan.weekly_schedule, reference_date=date.today())
+             updated_schedule = await run_in_threadpool(
+                 feast_manager.inject_feast_workout_into_plan, current_user.id, plan.weekly_schedule, reference_date=date.today()
+             )
              plan.weekly_schedule = updated_schedule
              
     except Exception as e:
@@ -13,9 +13,11 @@ from pydantic import BaseModel
 from typing import Optional
 import sys
 
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing
 observe = lambda *args, **kwargs: (lambda f: f)
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
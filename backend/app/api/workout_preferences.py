@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
 from app.models.user_profile import UserProfile
 from app.schemas.workout_preferences import WorkoutPreferencesCreate, WorkoutPreferencesUpdate, WorkoutPreferencesResponse
 from app.crud import workout_preferences as crud_workout_preferences
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_current_user_async
+from app.services.stats_service import invalidate_user_context
 
 router = APIRouter(
     prefix="/workout-preferences",
@@ -13,19 +16,20 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=WorkoutPreferencesResponse)
-def get_my_workout_preferences(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_my_workout_preferences(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     # First get user profile
-    user_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    if not user_profile:
+    result = await db.execute(select(UserProfile.id).where(UserProfile.user_id == current_user.id).limit(1))
+    user_profile_id = result.scalar_one_or_none()
+    if user_profile_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found. Please complete physical profile first."
         )
     
-    workout_preferences = crud_workout_preferences.get_by_user_profile_id(db, user_profile_id=user_profile.id)
+    workout_preferences = await crud_workout_preferences.get_by_user_profile_id_async(db, user_profile_id=user_profile_id)
     if not workout_preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,7 +57,9 @@ def create_or_update_workout_preferences(
     if existing_preferences:
         # Update
         update_schema = WorkoutPreferencesUpdate(**preferences_in.model_dump())
-        return crud_workout_preferences.update(db, db_obj=existing_preferences, obj_in=update_schema)
+        preferences = crud_workout_preferences.update(db, db_obj=existing_preferences, obj_in=update_schema)
     else:
         # Create
-        return crud_workout_preferences.create(db, obj_in=preferences_in, user_profile_id=user_profile.id)
+        preferences = crud_workout_preferences.create(db, obj_in=preferences_in, user_profile_id=user_profile.id)
+    invalidate_user_context(current_user.id)
+    return preferences
@@ -1,6 +1,7 @@
 # Import all CRUD modules
 from app.crud.user import (
     get_user, get_user_by_email, get_users, 
-    create_user, update_user, delete_user
+    create_user, update_user, delete_user,
+    get_user_async, get_user_by_email_async
 )
 
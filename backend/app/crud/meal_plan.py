@@ -180,19 +180,19 @@ def get_current_meal_plan_with_overrides(db: Session, user_id: int):
             override = overrides.get(item.meal_id.lower())
             
             if override:
-                # Store original values
-                item.original_nutrients = item.nutrients
-                item.original_portion_size = item.portion_size
-                
-                # Apply new values
-                item.nutrients = NutrientDetail(
-                    p=override.adjusted_protein,
-                    c=override.adjusted_carbs,
-                    f=override.adjusted_fat,
-                )
-                item.portion_size = override.adjusted_portion_size
-                item.feast_notes = [override.adjustment_note] if override.adjustment_note else []
-                # item.is_user_adjusted = True # Maybe? Or keep separate flag
+                # Frozen item: keep original values and apply the override on a copy
+                item = item.model_copy(update={
+                    "original_nutrients": item.nutrients,
+                    "original_portion_size": item.portion_size,
+                    "nutrients": NutrientDetail(
+                        p=override.adjusted_protein,
+                        c=override.adjusted_carbs,
+                        f=override.adjusted_fat,
+                    ),
+                    "portion_size": override.adjusted_portion_size,
+                    "feast_notes": (override.adjustment_note,) if override.adjustment_note else (),
+                    # "is_user_adjusted": True # Maybe? Or keep separate flag
+                })
             
             updated_items.append(item)
             
@@ -204,16 +204,16 @@ def get_current_meal_plan_with_overrides(db: Session, user_id: int):
         total_cal = (total_p * 4) + (total_c * 4) + (total_f * 9)
         
         # Update Generated Totals in Response
-        base_plan.daily_generated_totals = NutrientTotals(
-            calories=total_cal,
-            protein=total_p,
-            carbs=total_c,
-            fat=total_f
-        )
-        base_plan.meal_plan = updated_items
-        base_plan.verification += f" (Merged {len(overrides)} Overrides)"
-        
-        return base_plan
+        return base_plan.model_copy(update={
+            "daily_generated_totals": NutrientTotals(
+                calories=total_cal,
+                protein=total_p,
+                carbs=total_c,
+                fat=total_f
+            ),
+            "meal_plan": tuple(updated_items),
+            "verification": f"{base_plan.verification} (Merged {len(overrides)} Overrides)",
+        })
         
     except Exception as e:
         print(f"Error applying overrides: {e}")
@@ -0,0 +1,12 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.timezone import Timezone
+
+# name -> id; the lookup table is static, so load it once per process
+_timezone_ids = {}
+
+def get_timezone_id(db: Session, name: str):
+    """Return the timezones.id for an IANA name, or None if unknown."""
+    if not _timezone_ids:
+        _timezone_ids.update(db.execute(select(Timezone.name, Timezone.id)).all())
+    return _timezone_ids.get(name)
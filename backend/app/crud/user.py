@@ -1,8 +1,9 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.utils.utils import hash_password,verify_password,create_access_token
-from datetime import date
+from app.utils.utils import hash_password,verify_password,create_access_token,compute_age
 
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
@@ -10,13 +11,20 @@ def get_user(db: Session, user_id: int):
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
+async def get_user_async(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).offset(skip).limit(limit).all()
 
 def create_user(db: Session, user: UserCreate):
     # Calculate age from dob
-    today = date.today()
-    age = today.year - user.dob.year - ((today.month, today.day) < (user.dob.month, user.dob.day))
+    age = compute_age(user.dob)
 
     # Hash the password
     hashed_password = hash_password(user.password)
@@ -43,10 +51,9 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate):
     
     # Update age if dob is changed
     if 'dob' in update_data:
-        today = date.today()
         new_dob = update_data['dob']
         if new_dob:
-             update_data['age'] = today.year - new_dob.year - ((today.month, today.day) < (new_dob.month, new_dob.day))
+             update_data['age'] = compute_age(new_dob)
     
     # Remove old_password if present (it's not in the DB)
     if 'old_password' in update_data:
@@ -1,9 +1,9 @@
 # app/crud/user_profile.py
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from app.models.user_profile import UserProfile
+from app.models.user_profile import UserProfile, PHYSICAL_FIELDS, apply_nutrition_plan
 from app.schemas.user_profile import UserProfileCreate, UserProfileUpdate
-from datetime import datetime
+from datetime import datetime, timezone
 
 def get_user_profile(db: Session, user_profile_id: int):
     """Get user profile by its ID"""
@@ -34,7 +34,7 @@ def get_user_profiles(db: Session, user_id: int, skip: int = 0, limit: int = 100
 
 def create_user_profile(db: Session, user_profile: UserProfileCreate, user_id: int):
     """
-    Create a new user profile - calculations will be handled by SQLAlchemy events
+    Create a new user profile - nutrition targets are calculated before the insert
     """
     # Check if user already has a profile
     existing_profile = get_user_profile_by_user_id(db, user_id)
@@ -51,10 +51,11 @@ def create_user_profile(db: Session, user_profile: UserProfileCreate, user_id: i
         activity_level=user_profile.activity_level,
         country=user_profile.country,
         diet_type=user_profile.diet_type or "veg"
-        # Note: calories, protein, fat, carbs will be calculated automatically
-        # by the SQLAlchemy event listeners in the model
     )
     
+    # Calculate calories, protein, fat, carbs (owner age/gender read over the connection)
+    apply_nutrition_plan(db_profile, db.connection())
+    
     db.add(db_profile)
     db.commit()
     db.refresh(db_profile)
@@ -62,7 +63,7 @@ def create_user_profile(db: Session, user_profile: UserProfileCreate, user_id: i
 
 def update_user_profile(db: Session, profile_id: int, user_profile_update: UserProfileUpdate):
     """
-    Update an existing user profile - calculations will be handled by SQLAlchemy events
+    Update an existing user profile - nutrition targets are recalculated when a physical input changes
     """
     db_profile = db.query(UserProfile).filter(UserProfile.id == profile_id).first()
     if not db_profile:
@@ -71,13 +72,18 @@ def update_user_profile(db: Session, profile_id: int, user_profile_update: UserP
     # Get update data
     update_data = user_profile_update.model_dump(exclude_unset=True)
     
-    # Update fields
+    # Update fields, diffing physical inputs against the request
+    physical_changed = False
     for field, value in update_data.items():
         if value is not None:
+            if field in PHYSICAL_FIELDS and getattr(db_profile, field) != value:
+                physical_changed = True
             setattr(db_profile, field, value)
     
-    # Note: The before_update event listener will automatically
-    # recalculate calories, protein, fat, carbs when needed
+    # Recalculate calories, protein, fat, carbs only when an input changed
+    if physical_changed:
+        db_profile.last_physical_update = datetime.now(timezone.utc)
+        apply_nutrition_plan(db_profile, db.connection())
     
     db.commit()
     db.refresh(db_profile)
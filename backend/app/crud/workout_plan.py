@@ -1,4 +1,6 @@
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.workout_plan import WorkoutPlan
 from app.models.user_profile import UserProfile
@@ -18,3 +20,17 @@ def get_current_workout_plan(db: Session, user_id: int):
     if not profile:
         return None
     return db.query(WorkoutPlan).filter(WorkoutPlan.user_profile_id == profile.id).first()
+
+
+async def get_current_workout_plan_async(db: AsyncSession, user_id: int):
+    """
+    Async variant of get_current_workout_plan for `async def` endpoints.
+    Resolves profile -> plan in a single joined SELECT.
+    """
+    result = await db.execute(
+        select(WorkoutPlan)
+        .join(UserProfile, WorkoutPlan.user_profile_id == UserProfile.id)
+        .where(UserProfile.user_id == user_id)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.workout_preferences import WorkoutPreferences
 from app.schemas.workout_preferences import WorkoutPreferencesCreate, WorkoutPreferencesUpdate
@@ -5,6 +7,10 @@ from app.schemas.workout_preferences import WorkoutPreferencesCreate, WorkoutPre
 def get_by_user_profile_id(db: Session, user_profile_id: int):
     return db.query(WorkoutPreferences).filter(WorkoutPreferences.user_profile_id == user_profile_id).first()
 
+async def get_by_user_profile_id_async(db: AsyncSession, user_profile_id: int):
+    result = await db.execute(select(WorkoutPreferences).where(WorkoutPreferences.user_profile_id == user_profile_id))
+    return result.scalar_one_or_none()
+
 def create(db: Session, obj_in: WorkoutPreferencesCreate, user_profile_id: int):
     db_obj = WorkoutPreferences(
         **obj_in.model_dump(),
@@ -20,7 +26,6 @@ def update(db: Session, db_obj: WorkoutPreferences, obj_in: WorkoutPreferencesUp
     for field, value in update_data.items():
         setattr(db_obj, field, value)
     
-    db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
     return db_obj
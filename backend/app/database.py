@@ -1,11 +1,27 @@
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+# JSON/JSONB columns (meal plan snapshots, nutrients...) go through orjson both ways
+def _json_serializer(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+JSON_ENGINE_OPTIONS = {"json_serializer": _json_serializer, "json_deserializer": orjson.loads}
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **JSON_ENGINE_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for I/O-bound read endpoints (same database, asyncpg driver)
+async_engine = create_async_engine(
+    make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg"), **JSON_ENGINE_OPTIONS
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependecny to get a DB session for each request 
@@ -14,4 +30,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()  
\ No newline at end of file
+        db.close()  
+
+# Async dependency for `async def` endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
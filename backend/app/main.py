@@ -7,10 +7,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
+import importlib
 from app.database import engine,Base
+from app.services import llm_service
 import app.models
-from app.api import users,user_profile,meal_plan,login,workout_plan,workout_preferences,chat,tracking,workout_plan_async
-from app.api.admin import auth as admin_auth, users as admin_users, analytics as admin_analytics, foods as admin_foods, exercises as admin_exercises, feasts as admin_feasts, settings as admin_settings
 import logging
 
 # Configure Logging
@@ -71,28 +71,41 @@ app.add_middleware(
 )
 
 
-app.include_router(users.router)
-app.include_router(login.router)
-app.include_router(user_profile.router)
-app.include_router(meal_plan.router)
-app.include_router(workout_preferences.router)
-app.include_router(workout_plan.router)
-app.include_router(workout_plan_async.router)  # Async workout generation
-app.include_router(chat.router)
-app.include_router(tracking.router, prefix="/tracking", tags=["Tracking"])
-from app.api import notifications
-app.include_router(notifications.router)
-from app.api import social_events
-app.include_router(social_events.router)
-from app.api import feast_mode
-app.include_router(feast_mode.router)
-app.include_router(admin_auth.router)
-app.include_router(admin_users.router)
-app.include_router(admin_analytics.router)
-app.include_router(admin_foods.router)
-app.include_router(admin_exercises.router)
-app.include_router(admin_feasts.router)
-app.include_router(admin_settings.router)
+# Routers are registered from a module-path table. The AI coach (ai_coach and
+# LangGraph) is imported by the chat router on first use, so startup and /health
+# don't pay for it; llm_service and guardrails are imported eagerly.
+# (module path, include_router kwargs)
+ROUTER_MODULES = [
+    ("app.api.users", {}),
+    ("app.api.login", {}),
+    ("app.api.user_profile", {}),
+    ("app.api.meal_plan", {}),
+    ("app.api.workout_preferences", {}),
+    ("app.api.workout_plan", {}),
+    ("app.api.workout_plan_async", {}),  # Async workout generation
+    ("app.api.chat", {}),
+    ("app.api.tracking", {"prefix": "/tracking", "tags": ["Tracking"]}),
+    ("app.api.notifications", {}),
+    ("app.api.social_events", {}),
+    ("app.api.feast_mode", {}),
+    ("app.api.admin.auth", {}),
+    ("app.api.admin.users", {}),
+    ("app.api.admin.analytics", {}),
+    ("app.api.admin.foods", {}),
+    ("app.api.admin.exercises", {}),
+    ("app.api.admin.feasts", {}),
+    ("app.api.admin.settings", {}),
+]
+
+def register_routers(application: FastAPI):
+    for module_path, options in ROUTER_MODULES:
+        application.include_router(importlib.import_module(module_path).router, **options)
+
+register_routers(app)
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await llm_service.shutdown()
 
 # Root endpoint
 @app.get("/")
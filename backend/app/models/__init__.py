@@ -1,5 +1,6 @@
 # Import all models here
 from app.models.user import User
+from app.models.timezone import Timezone
 from app.models.user_profile import UserProfile
 from app.models.meal_plan import MealPlan
 from app.models.meal_plan_history import MealPlanHistory
@@ -1,18 +1,48 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, LargeBinary
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
+import zstandard
 from app.database import Base
 
+# Messages above this size (UTF-8 bytes) are stored zstd-compressed in
+# `content_compressed` instead of the plain `content` column.
+CONTENT_COMPRESSION_THRESHOLD = 2048
+
 class ChatHistory(Base):
     __tablename__ = "chat_history"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     role = Column(String, nullable=False)  # "user" or "assistant"
-    content = Column(Text, nullable=False)
+    _content = Column("content", Text, nullable=True)
+    content_compressed = deferred(Column(LargeBinary, nullable=True))
     custom_content = Column(JSON, nullable=True)
-    session_id = Column(String, nullable=True, index=True, default="default_session")
+    session_id = Column(String, nullable=True, default="default_session")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Session transcript reads filter on user + session and order by time
+        Index('ix_chat_history_user_id_session_id_created_at', 'user_id', 'session_id', 'created_at'),
+        # Coach hydration reads "latest N of a session" by id; leftmost column covers plain session lookups
+        Index('ix_chat_history_session_id_id', 'session_id', 'id'),
+    )
+
+    @property
+    def content(self):
+        if self._content is None and self.content_compressed is not None:
+            return zstandard.decompress(self.content_compressed).decode("utf-8")
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        raw = value.encode("utf-8") if value is not None else b""
+        if len(raw) > CONTENT_COMPRESSION_THRESHOLD:
+            self._content = None
+            self.content_compressed = zstandard.compress(raw)
+        else:
+            self._content = value
+            self.content_compressed = None
+
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
 
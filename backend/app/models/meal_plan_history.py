@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, ForeignKey, DateTime, String
+    Column, Integer, ForeignKey, DateTime, String, Index
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
@@ -15,8 +15,7 @@ class MealPlanHistory(Base):
     user_profile_id = Column(
         Integer,
         ForeignKey("user_profiles.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
 
     # Stores the full snapshot of the generated plan
@@ -36,6 +35,12 @@ class MealPlanHistory(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Coach history lookups range-scan one profile's day by created_at;
+        # leftmost column also covers plain user_profile_id lookups
+        Index("ix_meal_plan_history_profile_created", "user_profile_id", "created_at"),
+    )
+
     user_profile = relationship(
         "UserProfile",
         backref="history"
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, SmallInteger, String, event
+import pytz
+from app.database import Base
+
+# UTC is pinned to id 1 so it can serve as the column default
+UTC_TIMEZONE_ID = 1
+
+
+def timezone_names():
+    """IANA names in id order (UTC first)."""
+    return ["UTC"] + sorted(set(pytz.all_timezones) - {"UTC"})
+
+
+class Timezone(Base):
+    __tablename__ = "timezones"
+
+    id = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String(64), unique=True, nullable=False) # e.g. "Asia/Kolkata"
+
+
+@event.listens_for(Timezone.__table__, "after_create")
+def _seed_timezones(target, connection, **kw):
+    # Seeded by alembic as well; this covers the create_all fallback
+    connection.execute(
+        target.insert(),
+        [{"id": i, "name": name} for i, name in enumerate(timezone_names(), start=UTC_TIMEZONE_ID)]
+    )
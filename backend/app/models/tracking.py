@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 from app.database import Base
@@ -20,6 +20,11 @@ class FoodLog(Base):
     
     created_at = Column(DateTime, default=datetime.now)
 
+    __table_args__ = (
+        # Daily log lookups filter on user + date
+        Index('ix_food_logs_user_id_date', 'user_id', 'date'),
+    )
+
 class WorkoutLog(Base):
     __tablename__ = "workout_logs"
 
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Date, DateTime
 from app.database import Base
 from sqlalchemy.orm import relationship,validates
-from datetime import date, datetime
+from datetime import datetime
+from app.utils.utils import compute_age
 
 class User(Base):
     __tablename__ = "users"
@@ -20,8 +21,7 @@ class User(Base):
     @validates('dob')
     def update_age(self, key, dob_value):
         if dob_value:
-            today = date.today()
-            self.age = today.year - dob_value.year - ((today.month, today.day) < (dob_value.month, dob_value.day))
+            self.age = compute_age(dob_value)
         return dob_value
     
     # Relationships with cascade delete
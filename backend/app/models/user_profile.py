@@ -1,9 +1,13 @@
 # app/models/user_profile.py
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, event
+from sqlalchemy import Column, Integer, SmallInteger, Float, String, DateTime, ForeignKey, Index, inspect, select, text
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.orm.attributes import NO_VALUE
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
 import logging
 from app.database import Base
+from app.models.timezone import UTC_TIMEZONE_ID
 
 logger = logging.getLogger(__name__)
 
@@ -30,28 +34,104 @@ class UserProfile(Base):
     # Personal info & Timestamps
     country = Column(String(100))
     diet_type = Column(String(50))  # "veg" or "non_veg"
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_physical_update = Column(DateTime, default=datetime.utcnow)
-    timezone = Column(String(50), default="UTC") # e.g. "Asia/Kolkata"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Python-side default: update_user_profile bumps this when physical inputs change
+    last_physical_update = Column(DateTime(timezone=True), default=lambda: datetime.now(dt_timezone.utc))
+    timezone_id = Column(SmallInteger, ForeignKey("timezones.id"), nullable=False, default=UTC_TIMEZONE_ID, server_default=str(UTC_TIMEZONE_ID))
+    timezone_ref = relationship("Timezone", lazy="joined", innerjoin=True)
     
     # Relationship to User (which contains age and gender)
-    user = relationship("User", back_populates="profile")
-    meal_plan = relationship("MealPlan", back_populates="user_profile", cascade="all, delete")
-    workout_preferences = relationship("WorkoutPreferences", back_populates="user_profile", uselist=False, cascade="all, delete")
-    workout_plan = relationship("WorkoutPlan", back_populates="user_profile", uselist=False, cascade="all, delete")
+    # Joined so apply_nutrition_plan can read age/gender without a lazy SELECT
+    user = relationship("User", back_populates="profile", lazy="joined", innerjoin=True)
+    # Children must be loaded explicitly (selectinload) or queried directly;
+    # an implicit lazy load raises instead of silently issuing N+1 queries
+    meal_plan = relationship("MealPlan", back_populates="user_profile", cascade="all, delete", lazy="raise_on_sql")
+    workout_preferences = relationship("WorkoutPreferences", back_populates="user_profile", uselist=False, cascade="all, delete", lazy="raise_on_sql")
+    workout_plan = relationship("WorkoutPlan", back_populates="user_profile", uselist=False, cascade="all, delete", lazy="raise_on_sql")
+
+    @property
+    def timezone(self):
+        """IANA name, e.g. "Asia/Kolkata". Write through crud.timezone.get_timezone_id."""
+        return self.timezone_ref.name if self.timezone_ref is not None else "UTC"
+
+    __table_args__ = (
+        # Covers get_user_profile_by_user_and_id (user_id + id) as an index-only scan
+        Index('ix_user_profiles_user_id_id', 'user_id', 'id'),
+    )
 
 
 # --- CALCULATION ENGINE ---
 
 # --- CALCULATION ENGINE MOVED TO SERVICE ---
 # Please refer to app.services.nutrition_service for calculation logic.
-from app.services.nutrition_service import calculate_daily_targets
+from app.services.nutrition_service import calculate_daily_targets, calculate_daily_targets_batch
+from app.models.user import User
+
+_MACROS = ("calories", "protein", "fat", "carbs")
+
+@lru_cache(maxsize=4096)
+def _cached_daily_targets(weight, height, age, gender, activity_level, fitness_goal, diet_type, weight_goal):
+    """
+    calculate_daily_targets is pure, so memoize it on its inputs.
+    Returns an immutable tuple in _MACROS order so cached results can't be mutated.
+    """
+    results = calculate_daily_targets(
+        weight=weight,
+        height=height,
+        age=age,
+        gender=gender,
+        activity_level=activity_level,
+        fitness_goal=fitness_goal,
+        diet_type=diet_type,
+        weight_goal=weight_goal
+    )
+    return tuple(results[macro] for macro in _MACROS)
+
+def _compute_targets(weight, height, age, gender, activity_level, fitness_goal, diet_type, weight_goal):
+    """Applies age/gender defaults and rounds continuous inputs before the cached call."""
+    if age is None:
+        age = 25
+    if not gender:
+        gender = 'male'
+    # Rounded so FP jitter still hits the cache
+    return _cached_daily_targets(
+        round(weight, 1),
+        round(height, 1),
+        age,
+        gender,
+        activity_level,
+        fitness_goal,
+        diet_type,
+        round(weight_goal, 1) if weight_goal else weight_goal
+    )
+
+# Raw statement for the fallback path: no ORM compile or User instance construction
+_USER_AGE_GENDER_STMT = text("SELECT age, gender FROM users WHERE id = :uid")
+
+def _get_user_age_gender(target, connection=None):
+    """
+    Returns (age, gender) for the profile owner without an implicit lazy load.
+    Uses the already-loaded `user` relationship when present, otherwise reads
+    the two columns over `connection` (no extra Session work).
+    """
+    user = inspect(target).attrs.user.loaded_value
+    if user is not NO_VALUE and user is not None:
+        return user.age, user.gender
+
+    if connection is not None and target.user_id:
+        row = connection.execute(_USER_AGE_GENDER_STMT, {"uid": target.user_id}).first()
+        if row:
+            return row.age, row.gender
+
+    return None, None
 
-def apply_nutrition_plan(target):
+def apply_nutrition_plan(target, connection=None):
     """
     Applies calculated nutrition targets to the UserProfile instance.
     Uses the external nutrition_service to keep this model file clean.
+    Called explicitly by the profile CRUD before commit (not from flush events),
+    so the calculation never runs inside an open flush.
     """
     logger.info(f"Refreshing nutrition plan for profile {getattr(target, 'id', 'new')}")
     
@@ -64,70 +144,64 @@ def apply_nutrition_plan(target):
         return
 
     # Extract clean arguments for the service
-    # Note: Accessing relationship attributes (target.user) inside an event listener 
-    # might trigger a lazy load or be None if not yet flushed.
-    # We handle this gracefully.
-    age = 25
-    gender = 'male'
-    
-    if target.user:
-        age = getattr(target.user, 'age', 25)
-        gender = getattr(target.user, 'gender', 'male')
-        
-    # Call Service
-    results = calculate_daily_targets(
-        weight=target.weight,
-        height=target.height,
-        age=age,
-        gender=gender,
-        activity_level=target.activity_level,
-        fitness_goal=target.fitness_goal,
-        diet_type=target.diet_type, 
-        weight_goal=target.weight_goal
+    # Note: target.user may not be populated on fresh inserts, so fall back
+    # to the passed connection rather than a lazy load. We handle this gracefully.
+    age, gender = _get_user_age_gender(target, connection)
+    results = _compute_targets(
+        target.weight, target.height, age, gender,
+        target.activity_level, target.fitness_goal, target.diet_type, target.weight_goal
     )
     
-    # Apply results
     # Apply results ONLY if changed (to prevent spurious updated_at bumps)
-    
-    def is_diff(attr, new_val):
-        old_val = getattr(target, attr, 0.0) or 0.0
-        # Check tolerance for floats
-        return abs(old_val - new_val) > 0.1
-
-    if is_diff('calories', results['calories']):
-        target.calories = results['calories']
-    if is_diff('protein', results['protein']):
-        target.protein = results['protein']
-    if is_diff('fat', results['fat']):
-        target.fat = results['fat']
-    if is_diff('carbs', results['carbs']):
-        target.carbs = results['carbs']
-
-
-# --- AUTOMATION LISTENERS ---
-
-@event.listens_for(UserProfile, 'before_insert')
-def receive_before_insert(mapper, connection, target):
-    logger.info(f"Before insert event triggered for new profile")
-    apply_nutrition_plan(target)
-
-@event.listens_for(UserProfile, 'before_update')
-def receive_before_update(mapper, connection, target):
-    logger.info(f"Before update event triggered for profile {getattr(target, 'id', 'unknown')}")
-    
-    # Check if physical stats changed
-    physical_fields = ['weight', 'height', 'weight_goal', 'fitness_goal', 'activity_level', 'diet_type', 'country']
-    physical_changed = False
-    
-    for field in physical_fields:
-        # SQLAlchemy history inspection
-        from sqlalchemy.orm import attributes
-        history = attributes.get_history(target, field)
-        if history.has_changes():
-            physical_changed = True
-            break
-            
-    if physical_changed:
-        target.last_physical_update = datetime.utcnow()
-        
-    apply_nutrition_plan(target)
\ No newline at end of file
+    # Tolerance check for floats
+    for attr, new_val in zip(_MACROS, results):
+        if abs((getattr(target, attr) or 0.0) - new_val) > 0.1:
+            setattr(target, attr, new_val)
+
+
+def bulk_recompute_nutrition(session, profile_ids):
+    """
+    Recomputes calories/protein/fat/carbs for many profiles at once (e.g. after
+    changing the formulas in nutrition_service).
+    Reads only the input columns, computes all rows with the vectorized
+    calculate_daily_targets_batch and writes back with bulk_update_mappings, so no
+    UserProfile instances are built or tracked.
+    Caller commits. Returns the number of profiles updated.
+    """
+    rows = session.execute(
+        select(
+            UserProfile.id, UserProfile.weight, UserProfile.height, UserProfile.weight_goal,
+            UserProfile.activity_level, UserProfile.fitness_goal, UserProfile.diet_type,
+            User.age, User.gender
+        )
+        .join(User, User.id == UserProfile.user_id)
+        .where(UserProfile.id.in_(profile_ids))
+    ).all()
+
+    rows = [row for row in rows if row.weight and row.height]
+    if not rows:
+        return 0
+
+    # Same defaults and input rounding as _compute_targets, then one vectorized pass
+    results = calculate_daily_targets_batch(
+        weight=[round(row.weight, 1) for row in rows],
+        height=[round(row.height, 1) for row in rows],
+        age=[25 if row.age is None else row.age for row in rows],
+        gender=[row.gender or 'male' for row in rows],
+        activity_level=[row.activity_level for row in rows],
+        fitness_goal=[row.fitness_goal for row in rows],
+        diet_type=[row.diet_type for row in rows],
+        weight_goal=[round(row.weight_goal, 1) if row.weight_goal else row.weight_goal for row in rows]
+    )
+    columns = [results[macro].tolist() for macro in _MACROS]
+    mappings = [
+        {"id": row.id, **dict(zip(_MACROS, values))}
+        for row, values in zip(rows, zip(*columns))
+    ]
+
+    session.bulk_update_mappings(UserProfile, mappings)
+    return len(mappings)
+
+
+# Inputs whose change bumps last_physical_update and triggers a macro recompute
+PHYSICAL_FIELDS = ('weight', 'height', 'weight_goal', 'fitness_goal', 'activity_level', 'diet_type', 'country')
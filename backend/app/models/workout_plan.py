@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from datetime import datetime
 from app.database import Base
 
 class WorkoutPlan(Base):
@@ -15,12 +15,13 @@ class WorkoutPlan(Base):
     primary_goal = Column(String)
 
     # JSON Fields for complex data
-    weekly_schedule = Column(JSONB, nullable=False)
-    progression_guidelines = Column(JSONB)
-    cardio_recommendations = Column(JSONB)
+    # none_as_null: Python None is stored as SQL NULL rather than JSON 'null'
+    weekly_schedule = Column(JSONB(none_as_null=True), nullable=False)
+    progression_guidelines = Column(JSONB(none_as_null=True))
+    cardio_recommendations = Column(JSONB(none_as_null=True))
 
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationship
     user_profile = relationship("UserProfile", back_populates="workout_plan")
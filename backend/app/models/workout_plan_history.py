@@ -1,36 +1,61 @@
-from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, ForeignKey, DateTime
+    Column, Integer, ForeignKey, DateTime, Index, Sequence, text, DDL, event
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, backref
 from app.database import Base
 
 class WorkoutPlanHistory(Base):
     __tablename__ = "workout_plan_history"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Numbered from the sequence the migration keeps (a composite PK has no implicit serial)
+    id = Column(Integer, Sequence("workout_plan_history_id_seq"), primary_key=True, index=True)
 
-    # Reference to correct user profile
+    # Reference to correct user profile (also the partition key, hence part of the PK)
     user_profile_id = Column(
         Integer,
         ForeignKey("user_profiles.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        primary_key=True,
+        nullable=False
     )
 
     # Stores the full snapshot of the generated plan
     # This includes exercises, sets, reps, cardio, etc.
     workout_plan_snapshot = Column(
-        JSONB,
+        JSONB(none_as_null=True),
         nullable=False,
         comment="Snapshot of the generated workout plan (schedule object)"
     )
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # "Latest snapshot for profile" is a single backward index scan;
+        # leftmost column also covers plain user_profile_id lookups
+        Index("ix_wph_profile_created", "user_profile_id", text("created_at DESC")),
+        # History is always read per profile, so each query prunes to one partition
+        {"postgresql_partition_by": "HASH (user_profile_id)"},
+    )
 
     # Relationship back to profile
     user_profile = relationship(
         "UserProfile",
-        backref="workout_history"
+        backref=backref("workout_history", lazy="raise_on_sql")
+    )
+
+
+# Hash partitions backing the table (see alembic revision e7b3c9d2a415).
+# Registered here as well so the create_all fallback produces a writable table;
+# PostgreSQL only, other dialects (the SQLite test scripts) get a plain table.
+WPH_PARTITIONS = 32
+
+for _remainder in range(WPH_PARTITIONS):
+    event.listen(
+        WorkoutPlanHistory.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE workout_plan_history_p{_remainder:02d} PARTITION OF workout_plan_history "
+            f"FOR VALUES WITH (MODULUS {WPH_PARTITIONS}, REMAINDER {_remainder})"
+        ).execute_if(dialect="postgresql"),
     )
@@ -1,8 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
 
+HEALTH_RESTRICTION_CODES = ("none", "knee", "back", "shoulder", "other")
+
+
+def classify_health_restriction(text):
+    """Map free-text restrictions onto a coarse, indexable code."""
+    low = (text or "").strip().lower()
+    if low in ("", "none", "no", "n/a", "na"):
+        return "none"
+    for code in ("knee", "back", "shoulder"):
+        if code in low:
+            return code
+    return "other"
+
+
 class WorkoutPreferences(Base):
     __tablename__ = "workout_preferences"
 
@@ -14,9 +28,18 @@ class WorkoutPreferences(Base):
     days_per_week = Column(Integer)
     session_duration_min = Column(Integer)
     health_restrictions = Column(String(255), nullable=True) # "none" or specific text
+    health_restriction_code = Column(
+        Enum(*HEALTH_RESTRICTION_CODES, name="hr_code"),
+        default="none", server_default="none", nullable=False, index=True
+    ) # Derived from health_restrictions; filter on this instead of the text
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    @validates('health_restrictions')
+    def update_health_restriction_code(self, key, value):
+        self.health_restriction_code = classify_health_restriction(value)
+        return value
 
     # Relationship to UserProfile
     user_profile = relationship("UserProfile", back_populates="workout_preferences")
@@ -1,41 +1,49 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Tuple
 from datetime import datetime
 
 class MealPlanGenerateRequest(BaseModel):
     custom_prompt: Optional[str] = None
 
+# Plan items are never mutated after construction; build changed copies via model_copy(update=...)
 class NutrientDetail(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     p: float
     c: float
     f: float
 
 class MealItem(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     meal_id: str
     label: str
     is_veg: bool
     dish_name: str
     portion_size: str
     nutrients: NutrientDetail
-    alternatives: List[str]
-    guidelines: List[str]
-    feast_notes: Optional[List[str]] = None
+    alternatives: Tuple[str, ...]
+    guidelines: Tuple[str, ...]
+    feast_notes: Optional[Tuple[str, ...]] = None
     is_user_adjusted: Optional[bool] = False
     adjustment_note: Optional[str] = None
     original_nutrients: Optional[NutrientDetail] = None
     original_portion_size: Optional[str] = None
 
 class NutrientTotals(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     calories: float
     protein: float
     carbs: float
     fat: float
 
 class MealPlanResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     user_profile_id: int
     daily_targets: Optional[NutrientTotals] = None
     daily_generated_totals: Optional[NutrientTotals] = None
-    meal_plan: List[MealItem]
-    verification: Optional[str] = None
+    meal_plan: Tuple[MealItem, ...]
     verification: Optional[str] = None
-    created_at: Optional[datetime] = None
\ No newline at end of file
+    created_at: Optional[datetime] = None
@@ -1,28 +1,30 @@
 # app/schemas/user_profile.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
+# Enum-like inputs validated as Literal (set membership in pydantic-core, no regex)
+FitnessGoal = Literal["weight_loss", "fat_loss", "muscle_gain", "maintenance"]
+ActivityLevel = Literal["sedentary", "light", "moderate", "active", "extra_active"]
+DietType = Literal["veg", "non_veg", "both"]
+
 class UserProfileBase(BaseModel):
     weight: float = Field(..., gt=0, description="Current weight in kg")
     height: float = Field(..., gt=0, description="Height in cm")
     weight_goal: float = Field(..., gt=0, description="Target weight in kg")
     
-    fitness_goal: str = Field(
+    fitness_goal: FitnessGoal = Field(
         ..., 
-        pattern="^(weight_loss|fat_loss|muscle_gain|maintenance)$",
         description="weight_loss, fat_loss, muscle_gain, or maintenance"
     )
-    activity_level: str = Field(
+    activity_level: ActivityLevel = Field(
         ..., 
-        pattern="^(sedentary|light|moderate|active|extra_active)$",
         description="sedentary, light, moderate, active, or extra_active"
     )
     
     country: Optional[str] = None
-    diet_type: str = Field(
+    diet_type: DietType = Field(
         ..., 
-        pattern="^(veg|non_veg|both)$",
         description="veg, non_veg, or both"
     )
 
@@ -34,21 +36,18 @@ class UserProfileUpdate(BaseModel):
     height: Optional[float] = Field(None, gt=0, description="Height in cm")
     weight_goal: Optional[float] = Field(None, gt=0, description="Target weight in kg")
     
-    fitness_goal: Optional[str] = Field(
+    fitness_goal: Optional[FitnessGoal] = Field(
         None, 
-        pattern="^(weight_loss|fat_loss|muscle_gain|maintenance)$",
         description="weight_loss, fat_loss, muscle_gain, or maintenance"
     )
-    activity_level: Optional[str] = Field(
+    activity_level: Optional[ActivityLevel] = Field(
         None, 
-        pattern="^(sedentary|light|moderate|active|extra_active)$",
         description="sedentary, light, moderate, active, or extra_active"
     )
     
     country: Optional[str] = None
-    diet_type: Optional[str] = Field(
+    diet_type: Optional[DietType] = Field(
         None,
-        pattern="^(veg|non_veg|both)$",
         description="veg, non_veg, or both"
     )
 
@@ -80,7 +79,7 @@ class UserProfileResponse(BaseModel):
     fitness_goal: str
     activity_level: str
     
-    # Automated Calculations (From SQLAlchemy events)
+    # Automated Calculations (set by apply_nutrition_plan on profile save)
     calories: float
     protein: float
     fat: float
@@ -21,20 +21,11 @@ class DaySchedule(BaseModel):
     session_duration_min: Optional[int] = None
     activities: Optional[List[str]] = None # For rest/recovery days
 
-class WeeklySchedule(BaseModel):
-    day1: DaySchedule
-    day2: DaySchedule
-    day3: DaySchedule
-    day4: DaySchedule
-    day5: DaySchedule
-    day6: DaySchedule
-    day7: DaySchedule
-
 class WorkoutPlanBase(BaseModel):
     plan_name: str
     duration_weeks: int
     primary_goal: str
-    weekly_schedule: Dict[str, Any] # Using Dict/Any for flexibility, or could use WeeklySchedule model if structure is rigid
+    weekly_schedule: Dict[str, Any] # Stored as the LLM returns it; day entries loosely follow DaySchedule
     progression_guidelines: List[str]
     cardio_recommendations: List[str]
 
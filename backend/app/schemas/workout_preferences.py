@@ -1,9 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
+ExperienceLevel = Literal["beginner", "intermediate", "advanced"]
+HealthRestrictionCode = Literal["none", "knee", "back", "shoulder", "other"]
+
 class WorkoutPreferencesBase(BaseModel):
-    experience_level: str = Field(..., description="beginner, intermediate, advanced")
+    experience_level: ExperienceLevel = Field(..., description="beginner, intermediate, advanced")
     days_per_week: int = Field(..., ge=1, le=7, description="Number of workout days per week")
     session_duration_min: int = Field(..., gt=0, description="Session duration in minutes")
     health_restrictions: Optional[str] = Field("none", description="Any health restrictions")
@@ -12,12 +15,14 @@ class WorkoutPreferencesCreate(WorkoutPreferencesBase):
     pass
 
 class WorkoutPreferencesUpdate(BaseModel):
-    experience_level: Optional[str] = None
+    experience_level: Optional[ExperienceLevel] = None
     days_per_week: Optional[int] = Field(None, ge=1, le=7)
     session_duration_min: Optional[int] = Field(None, gt=0)
     health_restrictions: Optional[str] = None
 
 class WorkoutPreferencesResponse(WorkoutPreferencesBase):
+    experience_level: str  # Stored rows may predate the Literal check
+    health_restriction_code: HealthRestrictionCode = "none"  # Derived from health_restrictions
     id: int
     user_profile_id: int
     created_at: datetime
@@ -1,16 +1,34 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, undefer
+from app.database import SessionLocal
 from datetime import datetime
-from app.services.stats_service import StatsService
-from app.services.vector_service import VectorService
-from app.services.chat_memory_service import ChatMemoryService
-from app.services.llm_service import call_llm
+from app.services.stats_service import StatsService, invalidate_user_context
+from app.services.vector_service import VectorService, INTENT_CACHE_THRESHOLD
+from app.services.chat_memory_service import ChatMemoryService, MAX_MESSAGES
+from app.services.llm_service import call_llm_async, call_llm_json, call_llm_stream
+from app.services.feast_mode_manager import FeastModeManager
+from app.services.meal_service import adjust_single_meal, estimate_food_calories, adjust_todays_meal_plan
+from app.utils.llm_prompts.feast_prompts import (
+    FEAST_INTENT_DETECTION_PROMPT, FEAST_CONFIRMATION_PROMPT, FEAST_AI_COACH_CONTEXT_BLOCK
+)
+from langchain_core.messages import HumanMessage, AIMessage
+import asyncio
+import hashlib
 import json
+import orjson
+from collections import Counter
+import numpy as np
+from rapidfuzz import fuzz, process
+from itertools import chain
+import logging
 import re
 import sys
+import traceback
 from app.models.chat import ChatHistory
+from app.models.meal_plan import MealPlan
 from app.models.meal_plan_history import MealPlanHistory
 from app.models.tracking import FoodLog
-from sqlalchemy import func
+from app.models.user_profile import UserProfile
+from sqlalchemy import bindparam, case, func, literal_column, or_, select
 from datetime import date, timedelta
 from typing import TypedDict, List, Dict, Any, Optional
 try:
@@ -19,21 +37,510 @@ except ImportError:
     StateGraph = None
     END = None
 
+logger = logging.getLogger(__name__)
+
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator fallback
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
         pass
 
+# Stop words to remove for strict SQL search
+STOP_WORDS = frozenset({
+    "what", "is", "the", "in", "of", "and", "or", "to", "for", "a", "an", "are", 
+    "how", "much", "many", "calories", "protein", "carbs", "fats", "fat", "nutrition",
+    "give", "me", "tell", "show", "can", "you", "please", "help",
+    "compare", "vs", "versus", "diff", "difference", "between"
+})
+# Words (keeping inner apostrophes), so punctuation never sticks to a search term
+_TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+# Cheap gate before the intent detectors spend an LLM call: one scan finds trigger
+# words for all three detectors; the named group says which detector a hit belongs to
+# (words shared by the social and meal adjustment detectors have their own group).
+_INTENT_TRIGGER_RE = re.compile(
+    r"\b(?:"
+    r"(?P<social_adjust>party|dinners?)"
+    r"|(?P<history>yesterday|last|ago|history|previous|past"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+    r"|(?P<social>parties|weddings?|birthdays?|buffets?|cheat|events?|going out|big meals?)"
+    r"|(?P<adjust>eat(?:ing)? out|ordering|skip\w*|chang\w*|adjust\w*|pizzas?|burgers?|lunch\w*|breakfasts?)"
+    r")\b"
+)
+
+def _trigger_hits(msg_lower: str):
+    """Returns (history_hit, social_hit, adjust_hit) for a lowercased message."""
+    kinds = {match.lastgroup for match in _INTENT_TRIGGER_RE.finditer(msg_lower)}
+    shared = "social_adjust" in kinds
+    return "history" in kinds, shared or "social" in kinds, shared or "adjust" in kinds
+
+# Second gate for the social event detector: it only reports events dated after
+# today, so a message without any future-date phrase can't produce one
+# ("what should I eat for dinner" stops here).
+_FUTURE_DATE_RE = re.compile(
+    r"\b(?:tomorrow|tmrw|next|this|coming|upcoming|weekend|later|in \d+ (?:days?|weeks?)"
+    r"|mon|tue|wed|thu|fri|sat|sun|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec|january|february|march|april|may|june|july"
+    r"|august|september|october|november|december"
+    r"|\d{1,2}(?:st|nd|rd|th)|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?)\b"
+)
+
+# Values the intent classifiers copy out of the message (dates, counts): a semantic
+# cache hit is only served when these tokens match, since "last Tuesday" and
+# "last Wednesday" embed almost identically.
+_DATE_SLOT_RE = re.compile(
+    r"\b(?:\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?|\d+(?:st|nd|rd|th)?"
+    r"|today|tonight|tomorrow|tmrw|yesterday|last|next|this|coming|ago|weekend|days?|weeks?|months?|years?"
+    r"|one|two|three|four|five|six|seven|eight|nine|ten"
+    r"|mon|tue|wed|thu|fri|sat|sun|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec|january|february|march|april|may|june|july"
+    r"|august|september|october|november|december)\b"
+)
+
+def _date_slot_key(message: str) -> str:
+    """The message's date/number tokens in order ("last|tuesday"), or "-" if it has none."""
+    return "|".join(match.group(0) for match in _DATE_SLOT_RE.finditer(message.lower())) or "-"
+
+# Answers are only served from the semantic response cache for self-contained questions;
+# short follow-ups ("why?", "and lunch?") lean on the chat history instead.
+_RESPONSE_CACHE_MIN_WORDS = 4
+
+# Subject words a cached answer is specific to, on top of the date tokens: questions that
+# differ only in one of these ("protein in my lunch" vs "... dinner") embed as near-twins.
+_RESPONSE_SLOT_RE = re.compile(
+    r"\b(?:breakfast|lunch|dinner|snacks?|pre-workout|post-workout"
+    r"|protein|carbs?|carbohydrates?|fats?|fib(?:er|re)|sugar|sodium|calories?|kcal|water"
+    r"|chest|back|legs?|shoulders?|arms?|biceps|triceps|abs|core|glutes|hamstrings|quads|calves"
+    r"|cardio|strength|rest)\b"
+)
+
+def _response_slot_key(message: str) -> str:
+    """Date tokens (see _date_slot_key) plus the sorted subject words of a coach question."""
+    subjects = sorted({match.group(0) for match in _RESPONSE_SLOT_RE.finditer(message.lower())})
+    return f"{_date_slot_key(message)}#{'|'.join(subjects) or '-'}"
+
+def _response_context_key(user_context: Dict[str, Any]) -> str:
+    """Fingerprint of everything the coach's system prompt is built from (plus today's date)."""
+    payload = orjson.dumps(user_context, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha1(date.today().isoformat().encode() + b"|" + payload).hexdigest()
+
+# Prompt and knowledge scope: one scan tells whether a message is about diet, workouts
+# or both. Keywords match whole words with their listed inflections ("meals", "training"),
+# so words that merely contain one ("great", "meat", "report", "settings", "trainer") don't.
+_SCOPE_RE = re.compile(
+    r"\b(?:"
+    r"(?P<diet>eat(?:s|ing|en)?|foods?|meals?|diet(?:s|ing|ary)?|calories?|macros?|snack(?:s|ing)?"
+    r"|breakfasts?|lunch(?:es)?|dinners?|recipes?)"
+    r"|(?P<workout>workouts?|exercis(?:e|es|ed|ing)|gyms?|lift(?:s|ed|ing)?|run(?:s|ning)?|cardio"
+    r"|muscles?|sets?|reps?|train(?:s|ed|ing)?)"
+    r")\b"
+)
+
+def _message_scope(message: str):
+    """Returns (include_diet, include_workout): a message about only one side drops the other."""
+    is_diet_query = is_workout_query = False
+    for match in _SCOPE_RE.finditer(message.lower()):
+        if match.lastgroup == "diet":
+            is_diet_query = True
+        else:
+            is_workout_query = True
+        if is_diet_query and is_workout_query:
+            # Both sides mentioned; the rest of the message can't change the answer
+            break
+    if is_diet_query and not is_workout_query:
+        return True, False
+    if is_workout_query and not is_diet_query:
+        return False, True
+    return True, True
+
+# Context-only part of the coach system prompt by (context key, include_diet, include_workout);
+# a session's turns share it until plans, logs or profile change.
+_PROMPT_DOSSIER_CACHE_SIZE = 256
+_prompt_dossiers: Dict[tuple, str] = {}
+
+# "List my questions" requests, answered from session memory without running the graph
+_LIST_INTENT_RE = re.compile(
+    r"\blist\s+(?:out\s+)?(?:all\s+)?(?:the\s+|my\s+)?questions?"
+    r"|\bshow\s+(?:my\s+)?questions"
+    r"|\bwhat\s+(?:did\s+i\s+ask|have\s+i\s+asked)"
+)
+
+# "**Event**: <name> (YYYY-MM-DD)" line of a Feast Mode proposal
+_FEAST_EVENT_RE = re.compile(r"Event\*\*:?\s*(.*?)\s*\((\d{4}-\d{2}-\d{2})\)")
+
+# A proposal shown to the user is reused on confirm for this long (seconds); past
+# that, or on another day (start_date/days_remaining shift), it is recomputed.
+_FEAST_PROPOSAL_TTL = 600
+
+def _logged_meal_types(user_id: int, log_date: date) -> set:
+    """Lowercased meal types the user has logged on log_date (own session, safe off-thread)."""
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(FoodLog.meal_type).where(FoodLog.user_id == user_id, FoodLog.date == log_date)
+        ).scalars().all()
+    return {meal_type.lower() for meal_type in rows}
+
+def _stats_call(method: str, *args, **kwargs):
+    """Runs a StatsService method on its own session (safe off-thread)."""
+    with SessionLocal() as db:
+        return getattr(StatsService(db), method)(*args, **kwargs)
+
+def _schedule_by_weekday(schedule: Any) -> Dict[str, Any]:
+    """Re-keys a weekly schedule ("day1".. keys) by lowercased day_name, keeping plan order."""
+    if not isinstance(schedule, dict):
+        return {}
+    return {
+        (activity.get('day_name') or key).lower() if isinstance(activity, dict) else key.lower(): activity
+        for key, activity in schedule.items()
+    }
+
+def _load_user_context(user_id: int) -> Dict[str, Any]:
+    """Full 'Auditor' context plus any Feast Mode block, on its own session (safe off-thread)."""
+    with SessionLocal() as db:
+        context = StatsService(db).get_full_user_context_cached(user_id)
+        feast_ctx = FeastModeManager(db).get_feast_context_for_ai(user_id)
+    if feast_ctx:
+        context["feast_mode"] = feast_ctx
+    workout = context.get('workout_plan')
+    if workout:
+        # Normalized once here so generate does a single lookup by today's name
+        context['workout_plan'] = {**workout, 'schedule': _schedule_by_weekday(workout.get('schedule'))}
+    return context
+
+async def _no_results() -> list:
+    """Stand-in for a knowledge lookup that the message's scope rules out."""
+    return []
+
+def _profile_diet_type(user_id: int) -> Optional[str]:
+    """The user's diet type alone, so knowledge search needn't wait on the full context."""
+    with SessionLocal() as db:
+        return db.execute(_PROFILE_DIET_TYPE_STMT, {"user_id": user_id}).scalar_one_or_none()
+
+def _feast_proposal_to_session(proposal: dict) -> dict:
+    """JSON-safe copy of a Feast Mode proposal for session data, stamped with its creation time."""
+    return {
+        **proposal,
+        "event_date": proposal["event_date"].strftime("%Y-%m-%d"),
+        "start_date": proposal["start_date"].strftime("%Y-%m-%d"),
+        "proposed_at": datetime.now().timestamp(),
+    }
+
+def _feast_proposal_from_session(pending: Optional[dict], event_name: str, event_date: date, custom_deduction=None) -> Optional[dict]:
+    """Returns the stored proposal if it still matches the confirmed event and is fresh, else None."""
+    saved = (pending or {}).get("proposal")
+    if not saved or saved.get("event_name") != event_name:
+        return None
+    if datetime.now().timestamp() - saved.get("proposed_at", 0) > _FEAST_PROPOSAL_TTL:
+        return None
+    if custom_deduction and saved.get("daily_deduction") != custom_deduction:
+        return None
+    try:
+        saved_event_date = datetime.strptime(saved["event_date"], "%Y-%m-%d").date()
+        saved_start_date = datetime.strptime(saved["start_date"], "%Y-%m-%d").date()
+    except (KeyError, TypeError, ValueError):
+        return None
+    if saved_event_date != event_date or saved_start_date != date.today():
+        return None
+    proposal = {k: v for k, v in saved.items() if k != "proposed_at"}
+    proposal["event_date"] = saved_event_date
+    proposal["start_date"] = saved_start_date
+    return proposal
+
+# Classifier prompts are constant; callers append only "Current Date: ..." at the end so
+# the shared prefix stays byte-identical across requests (provider prefix caching).
+_HISTORY_INTENT_PROMPT = """
+You are a time-aware intent classifier.
+
+Task: Analyze the user's message. 
+1. Are they asking about a PAST diet/meal plan? 
+2. If yes, calculate the target date based on the Current Date.
+
+Output JSON ONLY:
+{
+    "is_history": true/false,
+    "target_date": "YYYY-MM-DD" (or null)
+}
+
+Examples (Assuming Today is 2026-02-05 Thursday):
+- "What did I eat yesterday?" -> {"is_history": true, "target_date": "2026-02-04"}
+- "Show me last Tuesday's plan" -> {"is_history": true, "target_date": "2026-01-27"}
+- "What is my plan for today?" -> {"is_history": false, "target_date": null}
+"""
+
+# Reply to a "Meal Adjustment Proposal"; fully static, the reply is sent as the user prompt
+_MEAL_ADJUST_CONFIRM_PROMPT = """
+The AI proposed adjusting a meal based on the user's request.
+Classify the user's reply.
+
+Output JSON:
+{
+   "action": "confirm" | "reject",
+   "reason": "explanation"
+}
+"""
+
+# Short, unambiguous replies to a proposal are classified locally; anything else
+# (questions, conditions, workout changes, mixed signals) still goes to the LLM.
+_CONFIRM_RE = re.compile(
+    r"\b(?:yes|yeah|yep|yup|ok|okay|sure|activate|confirm|do it|go ahead|sounds good|no problem|no worries|let'?s do it)\b"
+)
+_REJECT_RE = re.compile(r"\b(?:no(?!\s+(?:problem|worries))|nope|nah|cancel|reject|skip it)\b")
+_DEDUCTION_RE = re.compile(r"\b(\d{2,4})\s*(?:kcal|cals?|calories)?\b")
+_ESCALATE_RE = re.compile(r"\?|\b(?:not|don'?t|but|instead|if|less|more|fewer|workout|exercise|change|only)\b")
+_FAST_CONFIRM_MAX_WORDS = 6
+
+def _fast_confirm_parse(message: str, allow_customize: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Deterministic confirm/reject(/customize) parse of a reply to a proposal, in the
+    confirmation prompts' output shape. Returns None when the reply needs the LLM.
+    """
+    low_msg = message.lower().strip()
+    if len(low_msg.split()) > _FAST_CONFIRM_MAX_WORDS or _ESCALATE_RE.search(low_msg):
+        return None
+
+    confirm = bool(_CONFIRM_RE.search(low_msg))
+    reject = bool(_REJECT_RE.search(low_msg))
+    deduction = _DEDUCTION_RE.search(low_msg)
+    if deduction:
+        # "300 kcal" / "ok 300": a custom deduction
+        if not allow_customize or reject:
+            return None
+        return {"action": "customize", "custom_deduction": int(deduction.group(1)), "skip_workout": False}
+    if confirm == reject:
+        return None
+    return {"action": "confirm" if confirm else "reject", "custom_deduction": None, "skip_workout": False}
+
+# Multi-label classifier used when a message could be either a history question or a
+# future social event; output keys match the two single-purpose classifiers.
+_COMBINED_INTENT_PROMPT = """
+You are a time-aware intent classifier for a diet coach.
+
+Task: Analyze the user's message and decide which ONE applies:
+1. HISTORY: they ask about a PAST diet/meal plan -> set is_history and resolve target_date from the Current Date.
+2. SOCIAL_EVENT: they mention a specific FUTURE eating event (party, dinner, wedding, etc.) where they might
+   overeat or want to "bank" calories -> set is_social_event, event_name and event_date.
+3. NONE: neither.
+
+Output JSON ONLY:
+{
+    "is_history": true/false,
+    "target_date": "YYYY-MM-DD" (or null),
+    "is_social_event": true/false,
+    "event_name": "Birthday Party" (or null),
+    "event_date": "YYYY-MM-DD" (or null)
+}
+
+Examples (Assuming Today is 2026-02-05 Thursday):
+- "What did I eat at dinner last Tuesday?" -> {"is_history": true, "target_date": "2026-01-27", "is_social_event": false, "event_name": null, "event_date": null}
+- "I have a birthday party on Saturday" -> {"is_history": false, "target_date": null, "is_social_event": true, "event_name": "Birthday Party", "event_date": "2026-02-07"}
+"""
+
+def _intent_date() -> str:
+    """Today as the intent prompts print it. Day granularity keeps same-day prompts byte-identical."""
+    return date.today().strftime("%Y-%m-%d (%A)")
+
+def _normalize_snapshot(snapshot) -> Dict[str, Any]:
+    """Meal plan snapshots are stored as a list of meals or a dict keyed by meal; return the dict form."""
+    if isinstance(snapshot, list):
+        normalized = {}
+        for item in snapshot:
+            key = item.get('meal_id') or item.get('label', 'unknown').lower()
+            normalized[key] = item
+        return normalized
+    if isinstance(snapshot, dict):
+        return snapshot
+    return {}
+
+# Normalized history snapshots by plan id. History rows are append-only, so an id's
+# snapshot never changes; repeat questions about the same day skip the rebuild.
+_NORMALIZED_SNAPSHOT_CACHE_SIZE = 1024
+_normalized_snapshots: Dict[int, Dict[str, Any]] = {}
+
+def _normalized_history_snapshot(plan) -> Dict[str, Any]:
+    """_normalize_snapshot for a MealPlanHistory row, memoized on its id (treat the result as read-only)."""
+    normalized = _normalized_snapshots.get(plan.id)
+    if normalized is None:
+        if len(_normalized_snapshots) >= _NORMALIZED_SNAPSHOT_CACHE_SIZE:
+            # Evict the oldest insertion
+            del _normalized_snapshots[next(iter(_normalized_snapshots))]
+        normalized = _normalized_snapshots[plan.id] = _normalize_snapshot(plan.meal_plan_snapshot)
+    return normalized
+
+def _snapshot_dish(meal_data) -> str:
+    """Dish name of one normalized snapshot entry; '' when the entry has none."""
+    if not isinstance(meal_data, dict):
+        return ''
+    # Support both 'dish_name' (List format) and 'dish' (Dict format)
+    return meal_data.get('dish_name', '') or meal_data.get('dish', '') or ''
+
+# Planned dish names (stripped, lowercased) by plan id, for forensic matching
+_planned_dish_sets: Dict[int, frozenset] = {}
+
+def _planned_dishes(plan) -> frozenset:
+    """Dish names in a MealPlanHistory row's snapshot, memoized on its id."""
+    dishes = _planned_dish_sets.get(plan.id)
+    if dishes is None:
+        if len(_planned_dish_sets) >= _NORMALIZED_SNAPSHOT_CACHE_SIZE:
+            del _planned_dish_sets[next(iter(_planned_dish_sets))]
+        names = {
+            _snapshot_dish(meal_data).strip().lower()
+            for meal_data in _normalized_history_snapshot(plan).values()
+        }
+        names.discard('')
+        dishes = _planned_dish_sets[plan.id] = frozenset(names)
+    return dishes
+
+# partial_ratio at or above this counts as a partial match (substrings score 100)
+_PARTIAL_MATCH_THRESHOLD = 80
+
+def _score_plan_vs_logs(planned_dishes: frozenset, log_names: List[str], counts: np.ndarray, debug: bool = False) -> int:
+    """
+    Forensic match score of one plan against a day's logs: +10 per log that names a
+    planned dish exactly, +1 per log that only fuzzily matches one ("Chicken" ~ "Chicken Salad").
+    log_names are the day's distinct normalized log names and counts how often each was
+    logged; both are built once and shared by every candidate. Exact matches are hash
+    lookups; only the remaining names go into the fuzzy log x dish cdist matrix.
+    """
+    if not planned_dishes or not log_names:
+        return 0
+
+    # 1. Exact Match (High Score)
+    exact = np.fromiter((name in planned_dishes for name in log_names), dtype=bool, count=len(log_names))
+    # 2. Fuzzy Match (Low Score), skipped entirely when every log matched exactly
+    partial = np.zeros_like(exact)
+    unmatched = np.flatnonzero(~exact)
+    if unmatched.size:
+        similarity = process.cdist([log_names[i] for i in unmatched], list(planned_dishes), scorer=fuzz.partial_ratio)
+        partial[unmatched] = similarity.max(axis=1) >= _PARTIAL_MATCH_THRESHOLD
+
+    if debug:
+        for name, count, is_exact, is_partial in zip(log_names, counts, exact, partial):
+            if is_exact:
+                logger.debug("     [Match] Log '%s' x%d == Plan Item -> +%d Pts", name, count, 10 * count)
+            elif is_partial:
+                logger.debug("     [Partial] Log '%s' x%d ~ Plan Item -> +%d Pts", name, count, count)
+
+    return int(10 * counts[exact].sum() + counts[partial].sum())
+
+# Prompt-ready (indented JSON) snapshots by plan id, same append-only reasoning as above
+_serialized_snapshots: Dict[int, str] = {}
+
+def _history_snapshot_json(plan) -> str:
+    """The MealPlanHistory row's raw snapshot as indented JSON, memoized on its id."""
+    serialized = _serialized_snapshots.get(plan.id)
+    if serialized is None:
+        if len(_serialized_snapshots) >= _NORMALIZED_SNAPSHOT_CACHE_SIZE:
+            del _serialized_snapshots[next(iter(_serialized_snapshots))]
+        serialized = _serialized_snapshots[plan.id] = orjson.dumps(
+            plan.meal_plan_snapshot, option=orjson.OPT_INDENT_2
+        ).decode()
+    return serialized
+
+# --- HISTORY DATE FAST PATH ---
+# Common relative-date phrasings resolved locally; anything else goes to the LLM classifier.
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+def _last_weekday(match, today: date) -> date:
+    # Same convention as the classifier prompt: "last Tuesday" is Tuesday of the previous week
+    last_week_monday = today - timedelta(days=today.weekday() + 7)
+    return last_week_monday + timedelta(days=_WEEKDAYS.index(match.group(1)))
+
+_DATE_PATTERNS = [
+    (re.compile(r"\bday before yesterday\b"), lambda m, today: today - timedelta(days=2)),
+    (re.compile(r"\byesterday\b"), lambda m, today: today - timedelta(days=1)),
+    (re.compile(r"\blast (mon|tue|wed|thu|fri|sat|sun)[a-z]*\b"), _last_weekday),
+    (re.compile(r"\b(\d{1,3}) days? ago\b"), lambda m, today: today - timedelta(days=int(m.group(1)))),
+    (re.compile(r"\b(a|one) week ago\b"), lambda m, today: today - timedelta(days=7)),
+]
+
+def _parse_history_date(message: str) -> Optional[date]:
+    low_msg = message.lower()
+    today = date.today()
+    for pattern, resolve in _DATE_PATTERNS:
+        match = pattern.search(low_msg)
+        if match:
+            return resolve(match, today)
+    return None
+
+# --- HISTORY RETRIEVAL STATEMENTS ---
+# Built once at import; per call only the bound values change, so SQLAlchemy's
+# compiled cache is hit without rebuilding the query objects.
+# A day rarely has more than a handful of regenerations; older ones can't win the
+# "latest on ties" rule anyway, so only the most recent few are scored.
+_HISTORY_CANDIDATE_LIMIT = 10
+# The day's food logs ride along as one JSON column (an uncorrelated subquery, evaluated
+# once and only if some candidate row exists), so retrieval is a single round trip.
+_FOOD_LOGS_FOR_DATE_JSON = (
+    select(func.json_agg(func.json_build_object(
+        literal_column("'id'"), FoodLog.id,
+        literal_column("'food_name'"), FoodLog.food_name,
+        literal_column("'meal_type'"), FoodLog.meal_type,
+    )))
+    .where(
+        FoodLog.user_id == bindparam("user_id"),
+        FoodLog.date == bindparam("target_date")
+    )
+    .scalar_subquery()
+)
+_HISTORY_CANDIDATES_STMT = (
+    select(MealPlanHistory, _FOOD_LOGS_FOR_DATE_JSON.label("day_logs"))
+    .join(UserProfile, UserProfile.id == MealPlanHistory.user_profile_id)
+    .where(
+        UserProfile.user_id == bindparam("user_id"),
+        # Half-open range on the raw column, so (user_profile_id, created_at) serves it
+        MealPlanHistory.created_at >= bindparam("day_start"),
+        MealPlanHistory.created_at < bindparam("day_end")
+    )
+    .options(load_only(MealPlanHistory.id, MealPlanHistory.created_at, MealPlanHistory.meal_plan_snapshot))
+    .order_by(MealPlanHistory.created_at.desc())
+    .limit(_HISTORY_CANDIDATE_LIMIT)
+)
+
+# A stored user message counts as a question when it ends with "?" or opens with one of
+# these words (after stripping, case-insensitive). Postgres applies the same test to plain
+# rows; zstd-compressed (long) rows can't be matched in SQL and are checked after loading.
+_QUESTION_PREFIXES = ("what", "how", "why", "when", "where", "can", "is", "do", "does", "will", "list")
+_QUESTION_SQL_FILTER = or_(
+    ChatHistory._content.is_(None),
+    ChatHistory._content.op("~*")(r"^\s*(?:" + "|".join(_QUESTION_PREFIXES) + r")|\?\s*$"),
+)
+
+_PROFILE_DIET_TYPE_STMT = select(UserProfile.diet_type).where(UserProfile.user_id == bindparam("user_id"))
+
+# meal_id of the meal a confirmed adjustment targets, in one round trip through the
+# profile: a label match ("dinner") wins, a meal_id match is the fallback
+_ADJUST_TARGET_MEAL_ID_STMT = (
+    select(MealPlan.meal_id)
+    .join(UserProfile, MealPlan.user_profile_id == UserProfile.id)
+    .where(
+        UserProfile.user_id == bindparam("user_id"),
+        or_(func.lower(MealPlan.label) == bindparam("target"), MealPlan.meal_id == bindparam("target")),
+    )
+    .order_by(case((func.lower(MealPlan.label) == bindparam("target"), 0), else_=1))
+    .limit(1)
+)
+
 class GraphState(TypedDict):
     """
     Represents the state of the AI Coach Agent.
+    Kept a TypedDict: LangGraph stores state as per-key channels and hands each node
+    a dict read from them, so a dataclass/Pydantic state would add an instance build
+    per node on top of that dict. Nodes return only the keys they change.
     """
     user_message: str
     user_id: int
     session_id: str
+    # Request clock, read once so every prompt section agrees on "today"
+    today_name: str
+    today_str: str
+    intent_date: str  # "%Y-%m-%d (%A)", the date line of the intent classifier prompts
+    # Message scope (see _message_scope), shared by fetch_knowledge and generate
+    include_diet: bool
+    include_workout: bool
     
     # Internal Context
     intent_data: Optional[Dict[str, Any]]
@@ -48,6 +555,14 @@ class GraphState(TypedDict):
     final_response: str
     source: str
 
+def _coach_node(method_name: str):
+    """Graph node that dispatches to the coach instance carried in the run config."""
+    async def node(state: GraphState, config) -> GraphState:
+        coach = config["configurable"]["coach"]
+        return await getattr(coach, method_name)(state)
+    node.__name__ = method_name
+    return node
+
 class FitnessCoachService:
     """
     The Brain: Orchestrates the fitness chatbot logic.
@@ -55,32 +570,44 @@ class FitnessCoachService:
     and "The Notepad" (Redis) to generate context-aware responses.
     """
 
+    # Compiled LangGraph, shared across instances (see _build_graph)
+    _compiled_graph = None
+    # Qdrant client + embeddings are request-independent; built on first use, shared like the graph
+    _shared_vector_service: Optional[VectorService] = None
+
     def __init__(self, db: Session, session_id: str):
         self.stats_service = StatsService(db)
         self.db = db # Store session directly
-        self.vector_service = VectorService()
+        self.vector_service = self._get_vector_service()
         self.memory_service = ChatMemoryService(session_id)
         self.user_message = ""
-        # Stop words to remove for strict SQL search
-        self.stop_words = {
-            "what", "is", "the", "in", "of", "and", "or", "to", "for", "a", "an", "are", 
-            "how", "much", "many", "calories", "protein", "carbs", "fats", "fat", "nutrition",
-            "give", "me", "tell", "show", "can", "you", "please", "help",
-            "compare", "vs", "versus", "diff", "difference", "between"
-        }
+        # Set by get_response_stream: generate pushes LLM chunks here as they arrive
+        self._token_queue: Optional[asyncio.Queue] = None
+        # Speculative user-context load started by detect_intent, consumed by fetch_user_context
+        self._user_context_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def _get_vector_service(cls) -> VectorService:
+        if cls._shared_vector_service is None:
+            cls._shared_vector_service = VectorService()
+        return cls._shared_vector_service
+
+    def _session_memory(self, session_id: str) -> ChatMemoryService:
+        """The coach's own memory service for its session; a fresh one for any other session."""
+        if session_id == self.memory_service.session_id:
+            return self.memory_service
+        return ChatMemoryService(session_id)
 
     def _extract_search_terms(self, message: str) -> str:
         """
         Heuristic to extract potential food/exercise names from a sentence.
         E.g. "How much protein in apple?" -> "apple"
         """
-        words = message.lower().replace("?", "").replace(".", "").split()
-        keywords = [w for w in words if w not in self.stop_words]
+        # One tokenizing pass, filtered straight into the join
+        keywords = " ".join(w for w in _TOKEN_RE.findall(message.lower()) if w not in STOP_WORDS)
         
-        if not keywords:
-            return message # Fallback to original if everything filtered out
-            
-        return " ".join(keywords)
+        # Fallback to original if everything filtered out
+        return keywords or message
 
     def _diet_allows_food(self, user_diet_type: Optional[str], food_diet_type: Optional[str]) -> bool:
         """
@@ -101,110 +628,161 @@ class FitnessCoachService:
 
         return True
 
-    def _detect_history_intent(self, message: str) -> dict:
+    def _call_intent_llm(
+        self,
+        prompt_version: str,
+        system_prompt: str,
+        message: str,
+        semantic_threshold: Optional[float] = INTENT_CACHE_THRESHOLD,
+        stop_on_false: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        call_llm_json for the intent classifiers, behind two caches:
+        1. Exact match in Redis on the normalized message + today's date (24h TTL).
+        2. Qdrant semantic match for rephrasings (cosine >= semantic_threshold), only
+           among messages with the same date/number tokens (_date_slot_key).
+           semantic_threshold=None skips this layer.
+        prompt_version ("history:v1", "social:v1", "meal_adjust:v1") namespaces both;
+        bump it whenever the classifier prompt changes.
+        stop_on_false is passed to call_llm_json (negative answers end the stream early).
+        """
+        normalized = message.strip().lower()
+        digest = hashlib.sha1(f"{normalized}|{date.today().isoformat()}".encode("utf-8")).hexdigest()
+        exact_key = f"intent:{prompt_version}:{digest}"
+        redis_client = self.memory_service.redis_client
+
+        if redis_client:
+            try:
+                cached = redis_client.get(exact_key)
+                if cached:
+                    logger.debug("[Intent Cache] Exact hit for %s", prompt_version)
+                    return json.loads(cached)
+            except Exception as e:
+                logger.warning("[Intent Cache] Redis lookup failed: %s", e)
+
+        slot_key = _date_slot_key(message)
+        response = query_vector = None
+        if semantic_threshold is not None:
+            response, query_vector = self.vector_service.search_intent_cache(
+                prompt_version, message, slot_key, threshold=semantic_threshold
+            )
+        if response is not None:
+            logger.debug("[Intent Cache] Semantic hit for %s", prompt_version)
+        else:
+            # This method's own Redis key already covers the exact match
+            response = call_llm_json(
+                system_prompt=system_prompt, user_prompt=message, temperature=0.0,
+                stop_on_false=stop_on_false, cache=False
+            )
+            if not response:
+                return response
+            if semantic_threshold is not None:
+                self.vector_service.store_intent_cache(prompt_version, message, slot_key, response, query_vector)
+
+        if redis_client:
+            try:
+                redis_client.setex(exact_key, 86400, json.dumps(response))
+            except Exception as e:
+                logger.warning("[Intent Cache] Redis store failed: %s", e)
+        return response
+
+    def _detect_history_intent(self, message: str, current_date: Optional[str] = None) -> dict:
         """
-        Uses LLM to detect if the user is asking about a specific past date.
+        Detects if the user is asking about a specific past date.
+        Plain relative dates are parsed locally; the LLM handles the rest.
         Returns {'date': datetime.date object} or None.
+        Callers gate on history trigger words first (_trigger_hits).
         """
-        # Quick heuristic check first to save LLM calls
-        triggers = ["yesterday", "last", "ago", "history", "previous", "past", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        if not any(t in message.lower() for t in triggers):
-            return None
+        parsed_date = _parse_history_date(message)
+        if parsed_date:
+            logger.debug("[History Intent] Parsed date locally: %s", parsed_date)
+            return {"date": parsed_date}
 
-        print(f"[History Intent] Checking intent for: '{message}'")
-        
-        system_prompt = f"""
-        You are a time-aware intent classifier.
-        Current Date: {datetime.now().strftime("%Y-%m-%d (%A)")}
+        logger.debug("[History Intent] Checking intent for: '%s'", message)
         
-        Task: Analyze the user's message. 
-        1. Are they asking about a PAST diet/meal plan? 
-        2. If yes, calculate the target date based on the Current Date.
-        
-        Output JSON ONLY:
-        {{
-            "is_history": true/false,
-            "target_date": "YYYY-MM-DD" (or null)
-        }}
-        
-        Examples (Assuming Today is 2026-02-05 Thursday):
-        - "What did I eat yesterday?" -> {{"is_history": true, "target_date": "2026-02-04"}}
-        - "Show me last Tuesday's plan" -> {{"is_history": true, "target_date": "2026-01-27"}}
-        - "What is my plan for today?" -> {{"is_history": false, "target_date": null}}
-        """
+        system_prompt = _HISTORY_INTENT_PROMPT + f"\nCurrent Date: {current_date or _intent_date()}"
         
         try:
-            from app.services.llm_service import call_llm_json
-            response = call_llm_json(system_prompt=system_prompt, user_prompt=message, temperature=0.0)
-            
-            if response and response.get('is_history') and response.get('target_date'):
-                target_str = response['target_date']
-                try:
-                    target_date = datetime.strptime(target_str, "%Y-%m-%d").date()
-                    print(f"[History Intent] Detected date: {target_date}")
-                    return {"date": target_date}
-                except ValueError:
-                    print(f"[History Intent] Failed to parse date: {target_str}")
-                    return None
-                    
+            response = self._call_intent_llm("history:v2", system_prompt, message, stop_on_false="is_history")
+            return self._history_from_response(response)
         except Exception as e:
-            print(f"[History Intent] Error: {e}")
+            logger.warning("[History Intent] Error: %s", e)
             
         return None
 
-    def _detect_social_event_intent(self, message: str) -> dict:
+    def _history_from_response(self, response: Optional[Dict[str, Any]]) -> Optional[dict]:
+        """Turns a classifier response ({is_history, target_date}) into {'date': date} or None."""
+        if response and response.get('is_history') and response.get('target_date'):
+            target_str = response['target_date']
+            try:
+                target_date = datetime.strptime(target_str, "%Y-%m-%d").date()
+                logger.debug("[History Intent] Detected date: %s", target_date)
+                return {"date": target_date}
+            except ValueError:
+                logger.debug("[History Intent] Failed to parse date: %s", target_str)
+        return None
+
+    def _detect_social_event_intent(self, message: str, current_date: Optional[str] = None) -> dict:
         """
         Detects if user is planning a future social event (Feast Mode).
         Triggers: 'party', 'wedding', 'birthday', 'dinner', 'buffet', 'cheat meal'
+        Callers gate on social trigger words first (_trigger_hits).
         """
-        msg_lower = message.lower()
-        triggers = ["party", "wedding", "birthday", "buffet", "cheat", "dinner", "event", "going out", "big meal"]
+        logger.debug("[Social Intent] Checking intent for: '%s'", message)
         
-        if not any(t in msg_lower for t in triggers):
-            return None
-            
-        print(f"[Social Intent] Checking intent for: '{message}'")
-        
-        from app.utils.llm_prompts.feast_prompts import FEAST_INTENT_DETECTION_PROMPT
-        system_prompt = FEAST_INTENT_DETECTION_PROMPT + f"\nCurrent Date: {datetime.now().strftime('%Y-%m-%d (%A)')}"
+        system_prompt = FEAST_INTENT_DETECTION_PROMPT + f"\nCurrent Date: {current_date or _intent_date()}"
         
         try:
-            from app.services.llm_service import call_llm_json
-            response = call_llm_json(system_prompt=system_prompt, user_prompt=message, temperature=0.0)
-            
-            if response and response.get('is_social_event') and response.get('event_date'):
-                target_str = response['event_date']
-                try:
-                    event_date = datetime.strptime(target_str, "%Y-%m-%d").date()
-                    # Ensure it's in the future
-                    if event_date <= date.today():
-                         print(f"[Social Intent] Event is not in future: {event_date}")
-                         return None
-                         
-                    print(f"[Social Intent] Detected event: {response['event_name']} on {event_date}")
-                    return {
-                        "event_name": response.get('event_name', 'Social Event'),
-                        "event_date": event_date
-                    }
-                except ValueError:
-                    return None
+            response = self._call_intent_llm("social:v1", system_prompt, message, stop_on_false="is_social_event")
+            return self._social_from_response(response)
         except Exception:
             pass
             
         return None
 
+    def _social_from_response(self, response: Optional[Dict[str, Any]]) -> Optional[dict]:
+        """Turns a classifier response ({is_social_event, event_name, event_date}) into event data or None."""
+        if response and response.get('is_social_event') and response.get('event_date'):
+            target_str = response['event_date']
+            try:
+                event_date = datetime.strptime(target_str, "%Y-%m-%d").date()
+            except ValueError:
+                return None
+            # Ensure it's in the future
+            if event_date <= date.today():
+                 logger.debug("[Social Intent] Event is not in future: %s", event_date)
+                 return None
+                 
+            logger.debug("[Social Intent] Detected event: %s on %s", response.get('event_name'), event_date)
+            return {
+                "event_name": response.get('event_name', 'Social Event'),
+                "event_date": event_date
+            }
+        return None
 
+    def _detect_combined_intent(self, message: str, current_date: Optional[str] = None):
+        """
+        One multi-label classifier call for messages that pass BOTH the history and
+        social trigger gates ("dinner last friday", "party next saturday"), instead of
+        two separate classifier calls.
+        Returns (history_intent, social_intent) in the same shapes as the single detectors.
+        """
+        logger.debug("[Combined Intent] Checking intent for: '%s'", message)
+        system_prompt = _COMBINED_INTENT_PROMPT + f"\nCurrent Date: {current_date or _intent_date()}"
+        try:
+            response = self._call_intent_llm("combined:v1", system_prompt, message)
+            return self._history_from_response(response), self._social_from_response(response)
+        except Exception as e:
+            logger.warning("[Combined Intent] Error: %s", e)
+        return None, None
 
     def _detect_meal_adjustment_intent(self, message: str) -> Optional[Dict[str, Any]]:
         """
         Detects if user wants to adjust a specific meal (e.g. eating out, skipping).
         Returns dict with target_meal, reason, user_estimated_calories, user_foods.
+        Callers gate on meal adjustment trigger words first (_trigger_hits).
         """
-        # Quick keyword check to save LLM calls
-        keywords = ['eat out', 'eating out', 'ordering', 'skip', 'change', 'adjust', 'pizza', 'burger', 'party', 'dinner', 'lunch', 'breakfast']
-        if not any(k in message.lower() for k in keywords):
-            return None
-            
+
         system_prompt = """Analyze if the user wants to ADJUST or OVERRIDE a specific meal in their plan.
         
         Possible scenarios:
@@ -229,8 +807,9 @@ class FitnessCoachService:
         """
         
         try:
-            from app.services.llm_service import call_llm_json
-            result = call_llm_json(system_prompt=system_prompt, user_prompt=message, temperature=0.0)
+            # Exact cache only: user_foods and user_estimated_calories are copied from
+            # the message, and "pizza, about 800 kcal" vs "... 1200 kcal" embed as near-twins
+            result = self._call_intent_llm("meal_adjust:v1", system_prompt, message, semantic_threshold=None)
             
             if result and result.get("is_adjustment") and result.get("confidence", 0) > 0.7:
                 return {
@@ -241,142 +820,116 @@ class FitnessCoachService:
                     "user_estimated_calories": result.get("user_estimated_calories")
                 }
         except Exception as e:
-            print(f"Error checking meal adjustment intent: {e}")
+            logger.warning("Error checking meal adjustment intent: %s", e)
             
         return None
+
+    def _get_historical_plan(self, user_id: int, target_date: date) -> Optional[Dict[str, Any]]:
         """
         Forensic Retrieval:
-        1. Fetches ALL plan snapshots for that day.
+        1. Fetches the most recent plan snapshots for that day.
         2. Fetches ALL food logs for that day.
         3. Identifies the 'True Plan' by matching logs to plans.
         4. Returns a detailed Context String (not just JSON).
+        Reads on its own session, so the history node can run it off-thread.
         """
         try:
-            # 0. Resolve Profile ID
-            from app.models.user_profile import UserProfile
-            profile = self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-            if not profile:
-                 print(f"[History Retrieval] No profile found for user_id {user_id}")
-                 return None
-            
-            profile_id = profile.id
-            print(f"[History Forensic] Resolved User ID {user_id} -> Profile ID {profile_id}")
-
-            # 1. Fetch Candidate Plans (Use Profile ID)
-            candidates = self.db.query(MealPlanHistory).filter(
-                MealPlanHistory.user_profile_id == profile_id,
-                func.date(MealPlanHistory.created_at) == target_date
-            ).order_by(MealPlanHistory.created_at.desc()).all()
-            
-            # 2. Fetch Evidence (Food Logs) (Use User ID)
-            logs = self.db.query(FoodLog).filter(
-                FoodLog.user_id == user_id,
-                FoodLog.date == target_date
-            ).all()
-            
-            if not candidates:
-                print(f"[History Forensic] No meal plans found for {target_date} (Profile {profile_id})")
-                return None
+            day_start = datetime.combine(target_date, datetime.min.time())
+            params = {
+                "user_id": user_id,
+                "target_date": target_date,
+                "day_start": day_start,
+                "day_end": day_start + timedelta(days=1),
+            }
+
+            with SessionLocal() as db:
+                # 1-2. Fetch Candidate Plans (profile resolved via join) and the Evidence
+                # (Food Logs, by User ID) in one query
+                rows = db.execute(_HISTORY_CANDIDATES_STMT, params).all()
                 
-            print(f"[History Forensic] Found {len(candidates)} candidates and {len(logs)} logs for {target_date}")
+            if not rows:
+                logger.debug("[History Forensic] No meal plans found for %s (User %s)", target_date, user_id)
+                return None
+
+            candidates = [row.MealPlanHistory for row in rows]
+            logs = rows[0].day_logs or []
             
-            # LOGGING DETAILS
-            if logs:
-                print("   --- EVIDENCE (LOGS) ---")
-                for l in logs:
-                    print(f"   [Log ID {l.id}] '{l.food_name}' ({l.meal_type})")
-            else:
-                print("   [History Forensic] No logs found for this date.")
+            # LOGGING DETAILS (per-row lines are skipped entirely unless debug is on)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("[History Forensic] Found %d candidates and %d logs for %s", len(candidates), len(logs), target_date)
+                if logs:
+                    logger.debug("   --- EVIDENCE (LOGS) ---")
+                    for l in logs:
+                        logger.debug("   [Log ID %s] '%s' (%s)", l["id"], l["food_name"], l["meal_type"])
+                else:
+                    logger.debug("   [History Forensic] No logs found for this date.")
 
-            if candidates:
-                print("   --- CANDIDATES (PLANS) ---")
+                logger.debug("   --- CANDIDATES (PLANS) ---")
                 for p in candidates:
-                    print(f"   [Plan ID {p.id}] Created: {p.created_at}")
+                    logger.debug("   [Plan ID %s] Created: %s", p.id, p.created_at)
 
             # 3. Forensic Matching
             best_plan = candidates[0] # Default to latest
             
             if logs:
                 best_score = -1
+                # Normalized and counted once; reused for every candidate
+                log_counts = Counter(log["food_name"].strip().lower() for log in logs)
+                log_names = list(log_counts)
+                counts = np.fromiter(log_counts.values(), dtype=np.int64, count=len(log_names))
+                max_score = 10 * len(logs)
                 
-                print("   --- MATCHING PROCESS ---")
+                if debug:
+                    logger.debug("   --- MATCHING PROCESS ---")
                 for plan in candidates:
-                    snapshot = plan.meal_plan_snapshot
-                    score = 0
-                    
-                    # SMART READER: Normalize snapshot (List -> Dict)
-                    normalized_snapshot = {}
-                    if isinstance(snapshot, list):
-                        for item in snapshot:
-                            key = item.get('meal_id') or item.get('label', 'unknown').lower()
-                            normalized_snapshot[key] = item
-                        print(f"     [Normalize] Converted List to Dict with keys: {list(normalized_snapshot.keys())}")
-                    elif isinstance(snapshot, dict):
-                        normalized_snapshot = snapshot
-                    
-                    # Extract all planned dish names
-                    planned_dishes = []
-                    for meal_data in normalized_snapshot.values():
-                        if isinstance(meal_data, dict):
-                            # Support both 'dish_name' (List format) and 'dish' (Dict format)
-                            dish = meal_data.get('dish_name', '') or meal_data.get('dish', '')
-                            dish = dish.strip().lower()
-                            if dish:
-                                planned_dishes.append(dish)
+                    # Planned dish names, memoized per plan (set: exact matches are O(1) lookups)
+                    planned_dishes = _planned_dishes(plan)
                     
-                    print(f"     [Extracted Dishes] {planned_dishes}")
+                    if debug:
+                        logger.debug("     [Extracted Dishes] %s", sorted(planned_dishes))
 
                     # Score this plan against logs
-                    for log in logs:
-                        log_name = log.food_name.strip().lower()
-                        
-                        # 1. Exact Match (High Score)
-                        if log_name in planned_dishes:
-                            score += 10
-                            print(f"     [Match] Log '{log_name}' == Plan Item -> +10 Pts")
-                        # 2. Substring Match (Low Score) - "Chicken" in "Chicken Salad"
-                        elif any(log_name in d or d in log_name for d in planned_dishes):
-                            score += 1
-                            print(f"     [Partial] Log '{log_name}' ~ Plan Item -> +1 Pts")
+                    score = _score_plan_vs_logs(planned_dishes, log_names, counts, debug)
                             
-                    print(f"   -> Plan ID {plan.id} Total Score: {score}")
+                    if debug:
+                        logger.debug("   -> Plan ID %s Total Score: %d", plan.id, score)
                     
                     if score > best_score:
                         best_score = score
                         best_plan = plan
                         
-            print(f"[History Forensic] >>> WINNER: Plan ID {best_plan.id}")
+                    # Every log matched exactly; later (older) candidates can only tie
+                    if best_score == max_score:
+                        break
+                        
+            logger.debug("[History Forensic] >>> WINNER: Plan ID %s", best_plan.id)
             
             # 4. Construct 'Plan vs Reality' Context
             snapshot = best_plan.meal_plan_snapshot
             
-            # SMART READER: Normalize snapshot (List -> Dict) for summary
-            normalized_snapshot = {}
-            if isinstance(snapshot, list):
-                for item in snapshot:
-                    key = item.get('meal_id') or item.get('label', 'unknown').lower()
-                    normalized_snapshot[key] = item
-            elif isinstance(snapshot, dict):
-                normalized_snapshot = snapshot
+            # SMART READER: Normalize snapshot (List -> Dict) for summary (cached from the scoring pass)
+            normalized_snapshot = _normalized_history_snapshot(best_plan)
             
             # Build Comparison Summary
             comparison = []
             meals = ["breakfast", "lunch", "dinner", "snacks"] 
+            lowered_logs = [(log["food_name"].lower(), log["food_name"]) for log in logs]
             
             for m in meals:
                 meal_data = normalized_snapshot.get(m, {})
-                # Support both 'dish_name' (List format) and 'dish' (Dict format)
-                plan_item = meal_data.get('dish_name', '') or meal_data.get('dish', 'Nothing Planned') if isinstance(meal_data, dict) else "Unknown"
+                plan_item = (_snapshot_dish(meal_data) or 'Nothing Planned') if isinstance(meal_data, dict) else "Unknown"
                 
                 # Check for log match for this meal type
                 status = "❌ No Log Found"
                 logged_item = "None"
                 
-                for log in logs:
+                plan_item_lower = plan_item.lower()
+                for log_lower, log_name in lowered_logs:
                     # Simple fuzzy match: is the log name in the dish name or vice versa?
-                    if log.food_name.lower() in plan_item.lower() or plan_item.lower() in log.food_name.lower():
+                    if log_lower in plan_item_lower or plan_item_lower in log_lower:
                         status = "✅ Followed"
-                        logged_item = log.food_name
+                        logged_item = log_name
                         break
                 
                 comparison.append(f"- **{m.capitalize()}**: Planned '{plan_item}' -> {status} (Log: {logged_item})")
@@ -385,14 +938,14 @@ class FitnessCoachService:
             context = {
                 "summary": "\n".join(comparison),
                 "full_plan": snapshot,
+                "full_plan_json": _history_snapshot_json(best_plan),
                 "logs_count": len(logs),
                 "candidates_count": len(candidates)
             }
             return context
 
         except Exception as e:
-            print(f"[History Retrieval] Forensic Error: {e}")
-            traceback.print_exc()
+            logger.error("[History Retrieval] Forensic Error: %s", e, exc_info=True)
             return None
 
     # --- LANGGRAPH NODES ---
@@ -403,24 +956,16 @@ class FitnessCoachService:
         msg = state["user_message"]
         
         # 0. Check for Confirmations (Multi-turn)
-        memory = ChatMemoryService(state["session_id"])
+        memory = self._session_memory(state["session_id"])
         last_ai_msg = memory.get_last_ai_message()
         if last_ai_msg:
              # A. Check Meal Adjustment Confirmation
              if "Meal Adjustment Proposal" in last_ai_msg:
-                 # Helper to parse confirmation
-                 from app.services.llm_service import call_llm_json
-                 confirm_prompt = f"""The AI proposed adjusting a meal based on the user's request.
-                 User reply: "{msg}"
-                 
-                 Output JSON:
-                 {{
-                    "action": "confirm" | "reject",
-                    "reason": "explanation"
-                 }}
-                 """
+                 # Helper to parse confirmation (the reply itself is the user prompt)
                  try:
-                     res = call_llm_json(system_prompt=confirm_prompt, user_prompt=msg, temperature=0.0)
+                     res = _fast_confirm_parse(msg) or call_llm_json(
+                         system_prompt=_MEAL_ADJUST_CONFIRM_PROMPT, user_prompt=msg, temperature=0.0
+                     )
                      if res and res.get("action") == "confirm":
                          pending = memory.get_session_data("pending_meal_adjustment")
                          if pending:
@@ -428,12 +973,11 @@ class FitnessCoachService:
                                      "social_event_data": None, 
                                      "meal_adjustment_data": {"type": "confirm", "data": pending}}
                  except Exception as e:
-                     print(f"Error parsing confirmation: {e}")
+                     logger.warning("Error parsing confirmation: %s", e)
 
              # B. Check Feast Mode Confirmation
              if "Feast Mode Proposal" in last_ai_msg:
-                import re
-                match = re.search(r"Event\*\*:?\s*(.*?)\s*\((\d{4}-\d{2}-\d{2})\)", last_ai_msg)
+                match = _FEAST_EVENT_RE.search(last_ai_msg)
                 if match:
                     event_name = match.group(1).strip()
                     event_date_str = match.group(2)
@@ -443,15 +987,15 @@ class FitnessCoachService:
                         event_date = None
 
                     if event_date:
-                        from app.services.llm_service import call_llm_json
-                        from app.utils.llm_prompts.feast_prompts import FEAST_CONFIRMATION_PROMPT
                         confirm_prompt = FEAST_CONFIRMATION_PROMPT.format(
                             event_name=event_name,
                             event_date=event_date.strftime("%Y-%m-%d")
                         )
 
                         try:
-                            confirmation = call_llm_json(system_prompt=confirm_prompt, user_prompt=msg, temperature=0.0)
+                            confirmation = _fast_confirm_parse(msg, allow_customize=True) or call_llm_json(
+                                system_prompt=confirm_prompt, user_prompt=msg, temperature=0.0
+                            )
                             if confirmation:
                                 action = confirmation.get("action", "reject")
                                 if action == "confirm":
@@ -478,35 +1022,61 @@ class FitnessCoachService:
                                             except: pass
                                     return {"intent_data": None, "social_event_data": event_data, "meal_adjustment_data": None}
                         except Exception as e:
-                            print(f"Feast confirm error: {e}")
+                            logger.warning("Feast confirm error: %s", e)
+
+        # Most turns take the standard path, which needs the user context: load it
+        # while the intent LLM calls run (dropped again on the social/meal paths).
+        # Started only after the confirmations above, which write the plan and
+        # invalidate the cache: a load begun before them could re-cache the old plan.
+        self._user_context_task = asyncio.create_task(asyncio.to_thread(_load_user_context, state["user_id"]))
+
+        # 1-3. Priority is history > social event > meal adjustment. History and social
+        # run together; the meal adjustment call only starts once both come back empty,
+        # since a thread-bound LLM call can't be cancelled and would be paid for anyway.
+        msg_lower = msg.lower()
+        history_hit, social_hit, adjust_hit = _trigger_hits(msg_lower)
+        social_hit = social_hit and _FUTURE_DATE_RE.search(msg_lower) is not None
+        history_intent, social_intent = await self._detect_history_and_social_intent(
+            msg, history_hit, social_hit, state["intent_date"]
+        )
 
         # 1. Check History Intent
-        history_intent = self._detect_history_intent(msg)
         if history_intent:
             return {"intent_data": history_intent, "social_event_data": None}
             
         # 2. Check Social Event Intent
-        social_intent = self._detect_social_event_intent(msg)
         if social_intent:
             return {"intent_data": None, "social_event_data": social_intent}
 
         # 3. Check Meal Adjustment Intent (Immediate change)
-        adj_intent = self._detect_meal_adjustment_intent(msg)
-        if adj_intent:
-            return {"intent_data": None, "social_event_data": None, "meal_adjustment_data": adj_intent}
+        if adjust_hit:
+            adj_intent = await asyncio.to_thread(self._detect_meal_adjustment_intent, msg)
+            if adj_intent:
+                return {"intent_data": None, "social_event_data": None, "meal_adjustment_data": adj_intent}
 
         return {"intent_data": None, "social_event_data": None, "meal_adjustment_data": None}
+
+    async def _detect_history_and_social_intent(self, msg: str, history_hit: bool, social_hit: bool, current_date: str):
+        """History and Social Event detectors behind their trigger gates; returns (history_intent, social_intent)."""
+        if history_hit and social_hit and not _parse_history_date(msg):
+            # Both gates pass and no local date: one multi-label LLM call covers both
+            return await asyncio.to_thread(self._detect_combined_intent, msg, current_date)
+        if history_hit:
+            return await asyncio.to_thread(self._detect_history_intent, msg, current_date), None
+        if social_hit:
+            return None, await asyncio.to_thread(self._detect_social_event_intent, msg, current_date)
+        return None, None
             
 
     @observe(name="node_process_social_event")
     async def _node_process_social_event(self, state: GraphState) -> GraphState:
         """Node: Handles Social Event logic (Proposal or Confirmation)."""
+        self._drop_user_context_task()
         social_data = state.get("social_event_data")
         if not social_data:
             return {}
             
         user_id = state["user_id"]
-        from app.services.feast_mode_manager import FeastModeManager
         manager = FeastModeManager(self.db)
         
         # Scenario A: Confirmation (Create Event)
@@ -516,14 +1086,16 @@ class FitnessCoachService:
             event_date = social_data["event_date"]
             
             # Retrieve pending context to get agreed deduction
-            memory = ChatMemoryService(state["session_id"])
+            memory = self._session_memory(state["session_id"])
             pending = memory.get_session_data("pending_feast_event")
             custom_deduction = None
             if pending and pending.get("daily_deduction"):
                  custom_deduction = pending.get("daily_deduction")
 
-            # Recalculate proposal to get correct numbers (sanity check)
-            proposal = manager.propose_strategy(user_id, event_date, event_name, custom_deduction=custom_deduction)
+            # Reuse the proposal the user just saw; recompute only if missing or stale
+            proposal = _feast_proposal_from_session(pending, event_name, event_date, custom_deduction)
+            if proposal is None:
+                proposal = manager.propose_strategy(user_id, event_date, event_name, custom_deduction=custom_deduction)
             
             if "error" in proposal:
                  return {"final_response": f"⚠️ Could not activate Feast Mode: {proposal['error']}", "source": "SocialService"}
@@ -535,8 +1107,7 @@ class FitnessCoachService:
                 
                 # --- Report Changes ---
                 # Check what overrides were generated for today
-                from datetime import date as date_type
-                today = date_type.today()
+                today = date.today()
                 overrides = manager.get_overrides_for_date(user_id, today)
                 
                 meal_adjust_msg = ""
@@ -571,6 +1142,7 @@ class FitnessCoachService:
                 
                 # Clear pending event from memory on success
                 memory.set_session_data("pending_feast_event", None)
+                invalidate_user_context(user_id)
                 
                 return {
                     "final_response": response_msg,
@@ -578,8 +1150,7 @@ class FitnessCoachService:
                 }
                 
             except Exception as e:
-                print(f"Activation failed: {e}")
-                import traceback
+                logger.error("Activation failed: %s", e)
                 traceback.print_exc()
                 return {"final_response": "Sorry, something went wrong activating Feast Mode.", "source": "error"}
         
@@ -588,6 +1159,7 @@ class FitnessCoachService:
             event_name = social_data["event_name"]
             event_date = social_data["event_date"]
             custom_deduction = social_data.get("custom_deduction")
+            memory = self._session_memory(state["session_id"])
             
             # Default proposal for context if needed
             proposal = None
@@ -609,8 +1181,11 @@ class FitnessCoachService:
                     f"> *Shall I activate this?*"
                 )
             else:
-                # User wants to adjust but didn't say how — ask what they want
-                proposal = manager.propose_strategy(user_id, event_date, event_name)
+                # User wants to adjust but didn't say how — ask what they want.
+                # The proposal from the previous turn is still in session; recompute only if it's gone or stale
+                proposal = _feast_proposal_from_session(memory.get_session_data("pending_feast_event"), event_name, event_date)
+                if not proposal:
+                    proposal = manager.propose_strategy(user_id, event_date, event_name)
                 current_deduction = proposal.get('daily_deduction', 500) if 'error' not in proposal else 500
                 
                 response = (
@@ -625,11 +1200,11 @@ class FitnessCoachService:
             if not proposal and custom_deduction:
                 to_save_deduction = custom_deduction
             
-            memory = ChatMemoryService(state["session_id"])
             memory.set_session_data("pending_feast_event", {
                 "event_name": event_name,
                 "event_date": event_date.strftime("%Y-%m-%d") if event_date else None,
-                "daily_deduction": to_save_deduction
+                "daily_deduction": to_save_deduction,
+                "proposal": _feast_proposal_to_session(proposal) if (proposal and 'error' not in proposal) else None
             })
             
             return {"final_response": response, "source": "SocialService"}
@@ -655,11 +1230,12 @@ class FitnessCoachService:
         )
         
         # Save context for next turn
-        memory = ChatMemoryService(state["session_id"])
+        memory = self._session_memory(state["session_id"])
         memory.set_session_data("pending_feast_event", {
             "event_name": event_name,
             "event_date": event_date.strftime("%Y-%m-%d"),
-            "daily_deduction": proposal['daily_deduction']
+            "daily_deduction": proposal['daily_deduction'],
+            "proposal": _feast_proposal_to_session(proposal)
         })
         
         return {"final_response": response, "source": "SocialService"}
@@ -667,13 +1243,12 @@ class FitnessCoachService:
     @observe(name="node_process_meal_adjustment")
     async def _node_process_meal_adjustment(self, state: GraphState) -> GraphState:
         """Node: Handles Meal Adjustment Logic (Proposal or Confirmation)."""
+        self._drop_user_context_task()
         adj_data = state.get("meal_adjustment_data")
         if not adj_data:
             return {}
             
         user_id = state["user_id"]
-        from app.services.meal_service import adjust_single_meal, estimate_food_calories, adjust_todays_meal_plan
-        from app.models.tracking import FoodLog
         
         # Scenario A: Confirmation
         if adj_data.get("type") == "confirm":
@@ -691,30 +1266,14 @@ class FitnessCoachService:
             # We assume label matches target_meal (e.g. 'dinner')
             
             try:
-                from app.models.user_profile import UserProfile
-                from app.models.meal_plan import MealPlan
                 
-                profile = self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-                if not profile: raise Exception("Profile not found")
+                real_meal_id = self.db.execute(
+                    _ADJUST_TARGET_MEAL_ID_STMT, {"user_id": user_id, "target": target_meal.lower()}
+                ).scalar_one_or_none()
                 
-                target_label = target_meal.lower()
-                meal_to_update = self.db.query(MealPlan).filter(
-                    MealPlan.user_profile_id == profile.id,
-                    func.lower(MealPlan.label) == target_label
-                ).first()
-                
-                if not meal_to_update:
-                     # Fallback search by ID
-                     meal_to_update = self.db.query(MealPlan).filter(
-                        MealPlan.user_profile_id == profile.id,
-                        MealPlan.meal_id == target_label
-                    ).first()
-                
-                if not meal_to_update:
+                if not real_meal_id:
                      return {"final_response": f"I couldn't find your '{target_meal}' in today's plan to adjust.", "source": "AI Coach"}
                 
-                real_meal_id = meal_to_update.meal_id
-                
                 # Call Service
                 override_info = {
                     "dish_name": dish_name,
@@ -722,18 +1281,22 @@ class FitnessCoachService:
                     "reason": reason
                 }
                 
-                result = adjust_single_meal(self.db, user_id, real_meal_id, override_info)
+                # Today's logged meals and the calorie target don't depend on the adjustment,
+                # so read them on their own sessions while the adjustment runs on self.db
+                today = datetime.now().date()
+                result, logged_meals, user_ctx = await asyncio.gather(
+                    asyncio.to_thread(adjust_single_meal, self.db, user_id, real_meal_id, override_info),
+                    asyncio.to_thread(_logged_meal_types, user_id, today),
+                    asyncio.to_thread(_stats_call, "get_user_profile", user_id),
+                )
                 
                 if "error" in result:
                      return {"final_response": f"Failed to update meal: {result['error']}", "source": "AI Coach"}
                      
                 # 2. Rebalance Remaining Meals (Optional but Smart)
-                today = datetime.now().date()
-                logs = self.db.query(FoodLog).filter(FoodLog.user_id == user_id, FoodLog.date == today).all()
-                completed_meals = set([l.meal_type.lower() for l in logs])
+                completed_meals = set(logged_meals)
                 completed_meals.add(target_meal.lower()) # Lock this one too
                 
-                user_ctx = self.stats_service.get_user_profile(user_id)
                 daily_target = user_ctx.get('caloric_target', 2000)
                 
                 # Trigger Rebalance
@@ -745,13 +1308,14 @@ class FitnessCoachService:
                     msg += f"\n\n⚖️ **Rebalancing**: I adjusted your other meals by **{int(patch_res['diff_applied'])} kcal** to keep you on target."
                 
                 # Clear memory
-                memory = ChatMemoryService(state["session_id"])
+                memory = self._session_memory(state["session_id"])
                 memory.set_session_data("pending_meal_adjustment", None)
+                invalidate_user_context(user_id)
                 
                 return {"final_response": msg, "source": "AI Coach"}
                 
             except Exception as e:
-                print(f"Error executing adjustment: {e}")
+                logger.error("Error executing adjustment: %s", e)
                 return {"final_response": "Something went wrong applying that change.", "source": "AI Coach"}
 
         # Scenario B: Proposal extraction
@@ -786,7 +1350,7 @@ class FitnessCoachService:
         )
         
         # Save to memory
-        memory = ChatMemoryService(state["session_id"])
+        memory = self._session_memory(state["session_id"])
         memory.set_session_data("pending_meal_adjustment", {
             "target_meal": target_meal,
             "dish_name": dish_name,
@@ -800,17 +1364,23 @@ class FitnessCoachService:
     async def _node_fetch_user_context(self, state: GraphState) -> GraphState:
         """Node: Fetches the 'Auditor' profile and progress."""
         user_id = state["user_id"]
-        context = self.stats_service.get_full_user_context(user_id)
-        
-        # [FEAST MODE] Inject Feast Context
-        from app.services.feast_mode_manager import FeastModeManager
-        feast_manager = FeastModeManager(self.db)
-        feast_ctx = feast_manager.get_feast_context_for_ai(user_id)
-        if feast_ctx:
-            context["feast_mode"] = feast_ctx
+        task, self._user_context_task = self._user_context_task, None
+        if task is not None:
+            # Started speculatively by detect_intent
+            context = await task
+        else:
+            # Off-thread on its own session: runs alongside fetch_history / fetch_knowledge
+            # (includes the [FEAST MODE] context)
+            context = await asyncio.to_thread(_load_user_context, user_id)
             
         return {"user_context": context}
 
+    def _drop_user_context_task(self):
+        """Cancels an unconsumed speculative user-context load (the thread finishes, its result is discarded)."""
+        task, self._user_context_task = self._user_context_task, None
+        if task is not None:
+            task.cancel()
+
     @observe(name="node_fetch_history")
     async def _node_fetch_history(self, state: GraphState) -> GraphState:
         """Node: Fetches historical plan/logs if intent detected."""
@@ -821,7 +1391,7 @@ class FitnessCoachService:
         target_date = intent['date']
         user_id = state["user_id"]
         
-        historical_context = self._get_historical_plan(user_id, target_date)
+        historical_context = await asyncio.to_thread(self._get_historical_plan, user_id, target_date)
         hist_str = ""
         
         if historical_context:
@@ -832,7 +1402,7 @@ class FitnessCoachService:
                     f"Target Date: {target_str}\n\n"
                     f"Based on your meal records for {target_str}, here is the plan you followed:\n\n"
                     f"1. **Plan vs Reality Summary**:\n{historical_context['summary']}\n\n"
-                    f"2. **The Identified 'Active' Plan Details**:\n{json.dumps(historical_context['full_plan'], indent=2)}\n\n"
+                    f"2. **The Identified 'Active' Plan Details**:\n{historical_context['full_plan_json']}\n\n"
                     f"INSTRUCTION: Answer using this verified context. Mention deviations if noted in the summary."
                 )
             else:
@@ -840,7 +1410,7 @@ class FitnessCoachService:
                     f"=== 📜 HISTORICAL DATA RETRIEVED ===\n"
                     f"Target Date: {target_str}\n\n"
                     f"According to your diet schedule for {target_str}, here is the plan:\n"
-                    f"{json.dumps(historical_context['full_plan'], indent=2)}\n\n"
+                    f"{historical_context['full_plan_json']}\n\n"
                     f"INSTRUCTION: State the plan clearly. Do NOT mention missing logs."
                 )
         else:
@@ -858,37 +1428,34 @@ class FitnessCoachService:
         """Node: Fetches relevant foods/exercises from Vector/SQL."""
         msg = state["user_message"]
         search_term = self._extract_search_terms(msg)
-        context = state.get("user_context") or {}
-        profile = context.get("profile") or {}
-        user_diet_type = profile.get("diet_type")
-
-        # Foods
-        sql_foods = self.stats_service.search_food_by_name(search_term, diet_type=user_diet_type)
-        vector_foods_raw = self.vector_service.search_food(msg, limit=5)
-        vector_foods = [
-            f for f in vector_foods_raw
-            if self._diet_allows_food(user_diet_type, f.get("diet_type"))
-        ]
-
-        seen_foods = set()
-        food_knowledge = []
-        for f in sql_foods + vector_foods:
-            if not self._diet_allows_food(user_diet_type, f.get("diet_type")):
-                continue
-            if f['name'] not in seen_foods:
-                food_knowledge.append(f)
-                seen_foods.add(f['name'])
+        include_diet = state["include_diet"]
+        include_workout = state["include_workout"]
+        # Runs in parallel with fetch_user_context, so the diet type is read on its own
+        user_diet_type = await asyncio.to_thread(_profile_diet_type, state["user_id"]) if include_diet else None
+
+        # SQL and vector lookups are independent round-trips; run them concurrently
+        # (SQL searches on their own sessions, since self.db isn't thread-safe).
+        # A single-scope message skips the other side's searches entirely.
+        sql_foods, vector_foods_raw, sql_exercises, vector_exercises = await asyncio.gather(
+            asyncio.to_thread(_stats_call, "search_food_by_name", search_term, diet_type=user_diet_type) if include_diet else _no_results(),
+            asyncio.to_thread(self.vector_service.search_food, msg, limit=5) if include_diet else _no_results(),
+            asyncio.to_thread(_stats_call, "search_exercise_by_name", search_term) if include_workout else _no_results(),
+            asyncio.to_thread(self.vector_service.search_exercises, msg, limit=5) if include_workout else _no_results(),
+        )
+
+        # Foods (dedup by case-insensitive name; first hit wins, so exact SQL rows beat
+        # vector payloads even when the two spell the name with different casing)
+        foods_by_name = {}
+        for f in chain(sql_foods, vector_foods_raw):
+            if self._diet_allows_food(user_diet_type, f.get("diet_type")):
+                foods_by_name.setdefault(f['name'].lower(), f)
+        food_knowledge = list(foods_by_name.values())
                 
         # Exercises
-        sql_exercises = self.stats_service.search_exercise_by_name(search_term)
-        vector_exercises = self.vector_service.search_exercises(msg, limit=5)
-        
-        seen_exercises = set()
-        ex_knowledge = []
-        for e in sql_exercises + vector_exercises:
-            if e['name'] not in seen_exercises:
-                ex_knowledge.append(e)
-                seen_exercises.add(e['name'])
+        exercises_by_name = {}
+        for e in chain(sql_exercises, vector_exercises):
+            exercises_by_name.setdefault(e['name'].lower(), e)
+        ex_knowledge = list(exercises_by_name.values())
                 
         return {"food_knowledge": food_knowledge, "exercise_knowledge": ex_knowledge}
 
@@ -902,18 +1469,31 @@ class FitnessCoachService:
         hist_str = state.get("historical_context_str", "")
         msg = state["user_message"]
         session_id = state["session_id"]
+        user_id = state["user_id"]
         
         # Load Memory
-        memory = ChatMemoryService(session_id=session_id)
+        memory = self._session_memory(session_id)
         # Note: We assume message was already persisted to memory/DB before graph or inside.
         # In this design, we'll do it before calling graph for safety.
+        # Bounded read: the prompt never carries more than the trimmed window
+        history = memory.get_messages(limit=MAX_MESSAGES)
+
+        # Semantic Cache: same user, same context, near-identical question -> skip the LLM.
+        # Only a session's opening question qualifies; later turns are read against the chat.
+        context_key = slot_key = query_vector = None
+        if not hist_str and len(history) <= 1 and len(_TOKEN_RE.findall(msg)) >= _RESPONSE_CACHE_MIN_WORDS:
+            context_key = _response_context_key(user_context)
+            slot_key = _response_slot_key(msg)
+            cached, query_vector = await asyncio.to_thread(
+                self.vector_service.search_response_cache, user_id, context_key, msg, slot_key
+            )
+            if cached and cached.get("content"):
+                return {"final_response": cached["content"], "source": "semantic_cache"}
         
         # Suggestions (reusing logic from original)
         suggestions = []
-        today_name = datetime.now().strftime("%A")
-        todays_activity = user_context.get('workout_plan', {}).get('schedule', {}).get(today_name, {})
-        if not todays_activity:
-             todays_activity = user_context.get('workout_plan', {}).get('schedule', {}).get(today_name.lower(), {})
+        today_name = state["today_name"]
+        todays_activity = user_context.get('workout_plan', {}).get('schedule', {}).get(today_name.lower(), {})
         
         if isinstance(todays_activity, dict):
             focus = todays_activity.get('focus', '')
@@ -921,39 +1501,35 @@ class FitnessCoachService:
             if focus:
                  suggestions = self.stats_service.get_suggested_exercises(focus, exclude_list, limit=5)
 
-        # 2. Scope Detection
-        include_diet = True
-        include_workout = True
-        
-        u_msg_lower = msg.lower()
-        diet_keywords = ['eat', 'food', 'meal', 'diet', 'calorie', 'macro', 'snack', 'breakfast', 'lunch', 'dinner', 'recipe']
-        workout_keywords = ['workout', 'exercise', 'gym', 'lift', 'run', 'cardio', 'muscle', 'set', 'rep', 'train']
-        
-        is_diet_query = any(k in u_msg_lower for k in diet_keywords)
-        is_workout_query = any(k in u_msg_lower for k in workout_keywords)
-        
-        if is_diet_query and not is_workout_query:
-            include_workout = False
-        elif is_workout_query and not is_diet_query:
-            include_diet = False
+        # 2. Scope Detection (done once per request, see get_response)
+        include_diet = state["include_diet"]
+        include_workout = state["include_workout"]
 
         # Build Prompt
         system_prompt = self._build_system_prompt(
             user_context, food_know, ex_know, suggestions,
-            include_diet=include_diet, include_workout=include_workout
+            include_diet=include_diet, include_workout=include_workout, context_key=context_key,
+            today_str=state["today_str"]
         )
         
         if hist_str:
             system_prompt += f"\n\n{hist_str}"
             
-        history = memory.get_messages()
         context_history_str = "\n".join([f"{m.type.upper()}: {m.content}" for m in history[:-1]])
 
         full_user_prompt = f"CONTEXT - CHAT HISTORY:\n{context_history_str}\n\nCURRENT USER MESSAGE:\n{msg}"
         
-        response = call_llm(system_prompt=system_prompt, user_prompt=full_user_prompt, temperature=0.7)
+        if self._token_queue is not None:
+            chunks = []
+            async for chunk in call_llm_stream(system_prompt=system_prompt, user_prompt=full_user_prompt, temperature=0.7):
+                chunks.append(chunk)
+                self._token_queue.put_nowait(chunk)
+            response = "".join(chunks)
+        else:
+            response = await call_llm_async(system_prompt=system_prompt, user_prompt=full_user_prompt, temperature=0.7)
         
         if not response:
+            context_key = None  # never cache the fallback
             response = "I'm having trouble connecting to my brain right now. Please try again."
             
         # Determine Source
@@ -963,23 +1539,36 @@ class FitnessCoachService:
         if "not in our library" in response.lower():
             source = "General AI"
             
+        if context_key:
+            await asyncio.to_thread(
+                self.vector_service.store_response_cache, user_id, context_key, msg, slot_key, response, source, query_vector
+            )
+            
         return {"final_response": response, "source": source}
 
     def _build_graph(self):
-        """Builds the LangGraph state machine."""
+        """
+        Builds the LangGraph state machine.
+        The graph is static, so it is compiled once per process and shared by every
+        coach instance; nodes reach the per-request coach through the run config
+        (see _coach_node), so get_response must pass it as config["configurable"]["coach"].
+        """
         if StateGraph is None:
             return None
+        # No await between check and assignment, so concurrent requests can't race here
+        if FitnessCoachService._compiled_graph is not None:
+            return FitnessCoachService._compiled_graph
             
         workflow = StateGraph(GraphState)
         
         # Add Nodes
-        workflow.add_node("detect_intent", self._node_detect_intent)
-        workflow.add_node("process_social_event", self._node_process_social_event)
-        workflow.add_node("process_meal_adjustment", self._node_process_meal_adjustment)
-        workflow.add_node("fetch_user_context", self._node_fetch_user_context)
-        workflow.add_node("fetch_history", self._node_fetch_history)
-        workflow.add_node("fetch_knowledge", self._node_fetch_knowledge)
-        workflow.add_node("generate", self._node_generate)
+        workflow.add_node("detect_intent", _coach_node("_node_detect_intent"))
+        workflow.add_node("process_social_event", _coach_node("_node_process_social_event"))
+        workflow.add_node("process_meal_adjustment", _coach_node("_node_process_meal_adjustment"))
+        workflow.add_node("fetch_user_context", _coach_node("_node_fetch_user_context"))
+        workflow.add_node("fetch_history", _coach_node("_node_fetch_history"))
+        workflow.add_node("fetch_knowledge", _coach_node("_node_fetch_knowledge"))
+        workflow.add_node("generate", _coach_node("_node_generate"))
         
         # Define Edges
         workflow.set_entry_point("detect_intent")
@@ -990,7 +1579,8 @@ class FitnessCoachService:
                 return "process_social_event"
             if state.get("meal_adjustment_data"):
                 return "process_meal_adjustment"
-            return "fetch_user_context"
+            # Standard path fans out: the three fetches are independent and write disjoint keys
+            return ["fetch_user_context", "fetch_history", "fetch_knowledge"]
 
         workflow.add_conditional_edges(
             "detect_intent",
@@ -998,7 +1588,9 @@ class FitnessCoachService:
             {
                 "process_social_event": "process_social_event",
                 "process_meal_adjustment": "process_meal_adjustment",
-                "fetch_user_context": "fetch_user_context"
+                "fetch_user_context": "fetch_user_context",
+                "fetch_history": "fetch_history",
+                "fetch_knowledge": "fetch_knowledge"
             }
         )
         
@@ -1006,33 +1598,58 @@ class FitnessCoachService:
         workflow.add_edge("process_social_event", END)
         workflow.add_edge("process_meal_adjustment", END)
         
-        # Standard Path
-        workflow.add_edge("fetch_user_context", "fetch_history")
-        workflow.add_edge("fetch_history", "fetch_knowledge")
+        # Standard Path: parallel fetches join at generate
+        workflow.add_edge("fetch_user_context", "generate")
+        workflow.add_edge("fetch_history", "generate")
         workflow.add_edge("fetch_knowledge", "generate")
         workflow.add_edge("generate", END)
         
-        return workflow.compile()
+        FitnessCoachService._compiled_graph = workflow.compile()
+        return FitnessCoachService._compiled_graph
+
+    @observe(name="fitness_coach_get_response_stream")
+    async def get_response_stream(self, user_message: str, user_id: int, session_id: str):
+        """
+        Streaming variant of get_response.
+        Yields ("delta", text) for each generated chunk, then ("done", result) with the
+        same dict get_response returns. Paths that don't stream (list questions, cache hits,
+        Feast Mode, meal adjustments) send their whole answer as a single delta.
+        """
+        self._token_queue = asyncio.Queue()
+        task = asyncio.create_task(self.get_response(user_message, user_id, session_id))
+        streamed = False
+        try:
+            while True:
+                getter = asyncio.ensure_future(self._token_queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                streamed = True
+                yield "delta", getter.result()
+            while not self._token_queue.empty():
+                streamed = True
+                yield "delta", self._token_queue.get_nowait()
+
+            result = task.result()
+            if not streamed:
+                yield "delta", result["content"]
+            yield "done", result
+        finally:
+            task.cancel()
+            self._token_queue = None
 
     @observe(name="fitness_coach_get_response")
     async def get_response(self, user_message: str, user_id: int, session_id: str) -> dict:
         # Load memory for this specific session
-        memory = ChatMemoryService(session_id=session_id)
-        
-        # HYDRATION STEP
-        if memory.is_empty():
-            print(f"[Memory] Session {session_id} is empty. Hydrating from DB...")
-            self._hydrate_session_from_db(memory, user_id, session_id)
+        memory = self._session_memory(session_id)
         
-        # 0. Check for "List Questions" Intent
+        # 0. Check for "List Questions" Intent (answered from the question list alone,
+        # so it runs before the message-history hydration below)
         low_msg = user_message.lower().strip()
-        list_intents = [
-            "list out all the question", "list all questions", "what did i ask", 
-            "show my questions", "list my questions", "list out questions",
-            "list questions", "show questions", "what have i asked"
-        ]
         
-        if any(intent in low_msg for intent in list_intents):
+        # Every phrasing mentions "question" or "ask"; the substring test skips the regex for most messages
+        if ("question" in low_msg or "ask" in low_msg) and _LIST_INTENT_RE.search(low_msg):
             questions = memory.get_session_questions()
             if not questions:
                  self._hydrate_session_questions_from_db(memory, session_id)
@@ -1044,26 +1661,37 @@ class FitnessCoachService:
             q_list = "\n".join([f"- {q}" for q in questions])
             return {"content": f"Here are the questions you've asked in this chat:\n\n{q_list}", "source": "memory"}
 
-        # 1. Capture User Query
-        if user_message.strip():
-            memory.add_question_to_session(user_message.strip())
+        # HYDRATION STEP
+        if memory.is_empty():
+            logger.debug("[Memory] Session %s is empty. Hydrating from DB...", session_id)
+            self._hydrate_session_from_db(memory, user_id, session_id)
+
+        # 1. Capture User Query and add the user message to memory first (to match original logic),
+        # in one Redis round trip. Postgres persistence of the turn is done by the chat API.
+        with memory.pipeline():
+            if user_message.strip():
+                memory.add_question_to_session(user_message.strip())
+            memory.add_user_message(user_message)
 
         # 2. RUN GRAPH
-        print(f"\n--- [Coach] Processing Message via LangGraph: '{user_message}' ---")
-        
-        # We add the user message to memory first (to match original logic)
-        self.memory_service.add_user_message(user_message)
-        self._persist_message(user_id, "user", user_message)
+        logger.debug("--- [Coach] Processing Message via LangGraph: '%s' ---", user_message)
         
         # Build and Run Graph
         app = self._build_graph()
         if not app:
              return {"content": "Error: Graph could not be initialized.", "source": "error"}
 
+        now = datetime.now()
+        include_diet, include_workout = _message_scope(user_message)
         initial_state = {
             "user_message": user_message,
             "user_id": user_id,
             "session_id": session_id,
+            "today_name": now.strftime("%A"),
+            "today_str": now.strftime("%A, %B %d, %Y"),
+            "intent_date": now.strftime("%Y-%m-%d (%A)"),
+            "include_diet": include_diet,
+            "include_workout": include_workout,
             "intent_data": None,
             "historical_context_str": "",
             "food_knowledge": [],
@@ -1073,39 +1701,29 @@ class FitnessCoachService:
         try:
             # Invoke Graph
             inputs = initial_state
-            result = await app.ainvoke(inputs)
+            result = await app.ainvoke(inputs, config={"configurable": {"coach": self}})
             
             final_response = result.get("final_response", "I'm having trouble thinking right now.")
             source = result.get("source", "General AI")
             
-            # 3. Update Memory with AI response
-            self.memory_service.add_ai_message(final_response)
-            self._persist_message(user_id, "assistant", final_response)
+            # 3. Update Memory with AI response (push, trim and TTL refresh in one round trip)
+            memory.add_ai_message(final_response)
             
             return {"content": final_response, "source": source}
             
         except Exception as e:
-            print(f"[Graph Error]: {e}")
-            import traceback
+            logger.error("[Graph Error]: %s", e)
             traceback.print_exc()
             return {"content": "Sorry, I encountered an error processing your request.", "source": "error"}
+        finally:
+            self._drop_user_context_task()
 
         return response
 
-    def _persist_message(self, user_id: int, role: str, content: str):
-        """Save a message to the long-term PostgreSQL database."""
-        try:
-            chat_record = ChatHistory(user_id=user_id, role=role, content=content)
-            self.db.add(chat_record)
-            self.db.commit()
-        except Exception as e:
-            print(f"Error saving chat history: {e}")
-            self.db.rollback()
-
     def _hydrate_session_from_db(self, memory: ChatMemoryService, user_id: int, session_id: str):
         """
         Loads the last 10 messages from PostgreSQL and sets them in Redis.
-        Also populates the questions list.
+        Also populates the questions list from the same rows (one query).
         """
         try:
             # 1. Get Messages
@@ -1118,18 +1736,19 @@ class FitnessCoachService:
             if session_id.startswith(f"user_{user_id}_"):
                 raw_session_id = session_id.replace(f"user_{user_id}_", "")
 
-            history = self.db.query(ChatHistory).filter(
+            # Newest first; the memory window is the head, questions come from the user rows
+            rows = self.db.query(ChatHistory).filter(
                 ChatHistory.session_id == raw_session_id
-            ).order_by(ChatHistory.id.desc()).limit(10).all()
+            ).options(undefer(ChatHistory.content_compressed)).order_by(ChatHistory.id.desc()).limit(50).all()
             
-            if not history:
+            if not rows:
                 return
             
             # Sort back to Chronological
+            history = rows[:10]
             history.reverse()
             
             lc_messages = []
-            from langchain_core.messages import HumanMessage, AIMessage
             
             for msg in history:
                 if msg.role == "user":
@@ -1140,10 +1759,10 @@ class FitnessCoachService:
             memory.hydrate_messages(lc_messages)
             
             # 2. Hydrate Questions as well
-            self._hydrate_session_questions_from_db(memory, raw_session_id)
+            self._hydrate_questions_from_rows(memory, raw_session_id, [r for r in rows if r.role == "user"])
             
         except Exception as e:
-            print(f"[Hydration] Failed to sync session {session_id}: {e}")
+            logger.warning("[Hydration] Failed to sync session %s: %s", session_id, e)
 
     def _hydrate_session_questions_from_db(self, memory: ChatMemoryService, raw_session_id: str):
         """
@@ -1155,29 +1774,68 @@ class FitnessCoachService:
             # Limit to reasonable amount (e.g. 50 last interaction) so we don't scan forever if huge.
             user_msgs = self.db.query(ChatHistory).filter(
                 ChatHistory.session_id == raw_session_id,
-                ChatHistory.role == "user"
-            ).order_by(ChatHistory.id.desc()).limit(50).all()
-            
-            questions = []
-            for msg in user_msgs:
-                text = msg.content.strip()
-                low_text = text.lower()
-                is_q = text.endswith("?") or \
-                       low_text.startswith(("what", "how", "why", "when", "where", "can", "is", "do", "does", "will", "list"))
-                
-                if is_q:
-                    questions.append(text)
+                ChatHistory.role == "user",
+                _QUESTION_SQL_FILTER
+            ).options(undefer(ChatHistory.content_compressed)).order_by(ChatHistory.id.desc()).limit(50).all()
             
-            if questions:
-                memory.hydrate_questions(questions)
-                print(f"[Hydration] Restored {len(questions)} questions for session {raw_session_id}")
+            self._hydrate_questions_from_rows(memory, raw_session_id, user_msgs)
                 
         except Exception as e:
-             print(f"[Hydration] Failed to sync questions: {e}")
+             logger.warning("[Hydration] Failed to sync questions: %s", e)
+
+    def _hydrate_questions_from_rows(self, memory: ChatMemoryService, raw_session_id: str, user_msgs: List[ChatHistory]):
+        """Populates the Redis questions set from already-fetched user rows (newest first)."""
+        questions = []
+        for msg in user_msgs:
+            text = msg.content.strip()
+            low_text = text.lower()
+            is_q = text.endswith("?") or low_text.startswith(_QUESTION_PREFIXES)
+            
+            if is_q:
+                questions.append(text)
+        
+        if questions:
+            memory.hydrate_questions(questions)
+            logger.debug("[Hydration] Restored %d questions for session %s", len(questions), raw_session_id)
+
+    def _build_system_prompt(self, context, food_knowledge=None, exercise_knowledge=None, suggestions=None, include_diet=True, include_workout=True, context_key=None, today_str=None):
+        """
+        Constructs the system prompt: the user dossier (built from context alone, cached)
+        followed by the per-message knowledge and suggestions.
+        Keeping the dossier first also gives the provider a stable prompt prefix to cache.
+        """
+        today_str = today_str or datetime.now().strftime("%A, %B %d, %Y")
+        key = (context_key or _response_context_key(context), include_diet, include_workout, today_str)
+        dossier = _prompt_dossiers.get(key)
+        if dossier is None:
+            if len(_prompt_dossiers) >= _PROMPT_DOSSIER_CACHE_SIZE:
+                # Evict the oldest insertion
+                del _prompt_dossiers[next(iter(_prompt_dossiers))]
+            dossier = _prompt_dossiers[key] = self._build_prompt_dossier(context, include_diet, include_workout, today_str)
+
+        # Knowledge Context
+        food_context = "\n".join([f"- {f.get('name', 'Unknown')}: {f.get('calories',0)}kcal, Pro: {f.get('protein',0)}g" for f in food_knowledge or []])
+        ex_context = "\n".join([f"- {e.get('name', 'Unknown')}: {e.get('muscle_group', 'General')}" for e in exercise_knowledge or []])
+
+        return dossier + f"""
+        === KNOWLEDGE BASE (THE LIBRARIAN) ===
+        Relevant Data found for query:
+        Foods:
+        {food_context}
+        Exercises:
+        {ex_context}
+    
+        === VERIFIED SUGGESTIONS (DATABASE) ===
+        Based on today's focus, here are valid extra exercises from our library:
+        {chr(10).join([f"- {s['name']} (Target: {s['muscle']})" for s in suggestions or []])}
+        Use these EXACT NAMES if the user asks for "more exercises" or variations.
+    
+        Respond directly to the user now.
+        """
 
-    def _build_system_prompt(self, context, food_knowledge=None, exercise_knowledge=None, suggestions=None, include_diet=True, include_workout=True):
+    def _build_prompt_dossier(self, context, include_diet=True, include_workout=True, today_str=None):
         """
-        Constructs the system prompt based on user context.
+        Constructs the context-only part of the system prompt (identity, dossier, plans, instructions).
         Supports conditional inclusion of sections.
         """
         profile = context.get("profile", {})
@@ -1205,58 +1863,55 @@ class FitnessCoachService:
             f"F:{profile.get('targets', {}).get('fat', 0)}g"
         )
     
-        # Format Diet - Detailed Breakdown
-        diet_str = "Daily Diet (CURRENT PLAN - USE THIS EXACT DATA):\n"
+        # Format Diet - Detailed Breakdown (pieces collected and joined once)
+        diet_parts = ["Daily Diet (CURRENT PLAN - USE THIS EXACT DATA):\n"]
         if diet:
             for m in diet:
-                diet_str += f"\n[{m['meal'].upper()}]\n"
-                diet_str += f"Dish: {m['dish']}\n"
-                diet_str += f"Portion: {m.get('portion_size', 'Standard serving')}\n"
-                diet_str += f"Macros: {int(m.get('protein',0))}g P, {int(m.get('carbs',0))}g C, {int(m.get('fat',0))}g F ({int(m.get('calories',0))} kcal)\n"
+                diet_parts.append(
+                    f"\n[{m['meal'].upper()}]\n"
+                    f"Dish: {m['dish']}\n"
+                    f"Portion: {m.get('portion_size', 'Standard serving')}\n"
+                    f"Macros: {int(m.get('protein',0))}g P, {int(m.get('carbs',0))}g C, {int(m.get('fat',0))}g F ({int(m.get('calories',0))} kcal)\n"
+                )
                 if m.get('guidelines'):
-                    diet_str += f"Guidelines: {', '.join(m['guidelines'])}\n"
+                    diet_parts.append(f"Guidelines: {', '.join(m['guidelines'])}\n")
                 if m.get('alternatives'):
-                    diet_str += f"Alternatives: {', '.join(m['alternatives'])}\n"
+                    diet_parts.append(f"Alternatives: {', '.join(m['alternatives'])}\n")
         else:
-            diet_str += "No diet plan generated."
+            diet_parts.append("No diet plan generated.")
+        diet_str = "".join(diet_parts)
 
         # Format Workout
         schedule = workout.get('schedule', {})
-        schedule_str = "Weekly Workout Schedule:\n"
+        schedule_parts = ["Weekly Workout Schedule:\n"]
         if schedule:
             for day, activity in schedule.items():
                 if isinstance(activity, dict):
                     # Detailed breakdown
                     day_name = activity.get('day_name', day)
                     focus = activity.get('focus', 'Unspecified')
-                    schedule_str += f"- {day_name} ({focus}):\n"
+                    schedule_parts.append(f"- {day_name} ({focus}):\n")
                 
                     # Exercises
-                    exercises = activity.get('exercises', [])
-                    for ex in exercises:
-                        name = ex.get('exercise', 'Unknown')
-                        sets = ex.get('sets', 0)
-                        reps = ex.get('reps', '0')
-                        schedule_str += f"    * {name}: {sets} sets x {reps}\n"
+                    schedule_parts.extend(
+                        f"    * {ex.get('exercise', 'Unknown')}: {ex.get('sets', 0)} sets x {ex.get('reps', '0')}\n"
+                        for ex in activity.get('exercises', [])
+                    )
                     
                     # Cardio
-                    cardio = activity.get('cardio_exercises', [])
-                    for c in cardio:
-                        name = c.get('exercise', 'Unknown')
-                        dur = c.get('duration', '20min')
-                        schedule_str += f"    * Cardio: {name} ({dur})\n"
+                    schedule_parts.extend(
+                        f"    * Cardio: {c.get('exercise', 'Unknown')} ({c.get('duration', '20min')})\n"
+                        for c in activity.get('cardio_exercises', [])
+                    )
                 else:
                     # Legacy or string format
-                    schedule_str += f"- {day}: {activity}\n"
+                    schedule_parts.append(f"- {day}: {activity}\n")
         else:
-            schedule_str += "No workout plan generated."
+            schedule_parts.append("No workout plan generated.")
+        schedule_str = "".join(schedule_parts)
         
         prefs_str = f"Preferences: Level {prefs.get('level')}, {prefs.get('days_per_week')} days/week. Health Issues: {prefs.get('health_issues')}."
 
-        # Knowledge Context
-        food_context = "\n".join([f"- {f.get('name', 'Unknown')}: {f.get('calories',0)}kcal, Pro: {f.get('protein',0)}g" for f in food_knowledge])
-        ex_context = "\n".join([f"- {e.get('name', 'Unknown')}: {e.get('muscle_group', 'General')}" for e in exercise_knowledge])
-
         # Format Progress (The Auditor)
         progress = context.get("progress", {})
         completed = progress.get("completed_exercises", [])
@@ -1286,10 +1941,10 @@ class FitnessCoachService:
             f"           Weight Goal: {profile.get('weight', 0)}kg -> {profile.get('weight_goal', 'Not Set')}kg."
         )
 
-        # Date Context
-        today_str = datetime.now().strftime("%A, %B %d, %Y")
+        # Date Context (passed in from the request's clock when called from the graph)
+        today_str = today_str or datetime.now().strftime("%A, %B %d, %Y")
 
-        prompt = f"""
+        prompt_parts = [f"""
         # ROLE & IDENTITY
         You are FitCoach AI, a supportive and knowledgeable fitness assistant for {profile.get('name', 'User')}.
         You help with diet plans, workout routines, and the unique "Feast Mode" feature for social events.
@@ -1318,12 +1973,11 @@ class FitnessCoachService:
        
         2. REAL-TIME PROGRESS (THE AUDITOR):
            {progress_str}
-        """
+        """]
         
         # [FEAST MODE] Context Injection
         feast_data = context.get("feast_mode")
         if feast_data:
-            from app.utils.llm_prompts.feast_prompts import FEAST_AI_COACH_CONTEXT_BLOCK
             # Use safe get for base_calories
             base_cals = context.get('profile', {}).get('targets', {}).get('calories', 2000)
             
@@ -1337,33 +1991,21 @@ class FitnessCoachService:
                 effective_calories=feast_data['effective_calories'],
                 todays_overrides="\\n".join(feast_data['todays_overrides']) if feast_data.get('todays_overrides') else "None"
             )
-            prompt += f"\\n{feast_block}\\n"
+            prompt_parts.append(f"\\n{feast_block}\\n")
     
         if include_diet:
-            prompt += f"""
+            prompt_parts.append(f"""
         3. DIET PLAN (SCHEDULED):
            {diet_str}
-        """
+        """)
     
         if include_workout:
-            prompt += f"""
+            prompt_parts.append(f"""
         4. WORKOUT SCHEDULE:
            {schedule_str}
-        """
-    
-        prompt += f"""
-        === KNOWLEDGE BASE (THE LIBRARIAN) ===
-        Relevant Data found for query:
-        Foods:
-        {food_context}
-        Exercises:
-        {ex_context}
-    
-        === VERIFIED SUGGESTIONS (DATABASE) ===
-        Based on today's focus, here are valid extra exercises from our library:
-        {chr(10).join([f"- {s['name']} (Target: {s['muscle']})" for s in suggestions])}
-        Use these EXACT NAMES if the user asks for "more exercises" or variations.
+        """)
     
+        prompt_parts.append(f"""
         === CORE CAPABILITIES ===
         You can:
         1. Answer questions about nutrition, workouts, and fitness
@@ -1514,8 +2156,6 @@ class FitnessCoachService:
         - Respond in natural prose/paragraphs for casual conversation
         - Keep it concise and actionable
         - Safety first, always
+        """)
     
-        Respond directly to the user now.
-        """
-    
-        return prompt
\ No newline at end of file
+        return "".join(prompt_parts)
\ No newline at end of file
@@ -1,8 +1,28 @@
-from typing import List, Dict, Any
+import json
+import logging
+import redis
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
 from langchain_community.chat_message_histories import RedisChatMessageHistory
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, message_to_dict, messages_from_dict
 from config import REDIS_URL
 
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGES = 5
+HISTORY_TTL = 1800  # 30 minutes
+_HISTORY_KEY_PREFIX = "message_store:"
+
+# One connection pool per process, shared by every ChatMemoryService instance
+# and the stats / LLM caches
+_redis_pool = None
+
+def get_redis_pool():
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = redis.ConnectionPool.from_url(REDIS_URL)
+    return _redis_pool
+
 class ChatMemoryService:
     """
     The Notepad: Manages chat history using Redis.
@@ -13,31 +33,84 @@ class ChatMemoryService:
         self.session_id = session_id
         # Use a distinct prefix for fitness chat sessions
         self.url = REDIS_URL
-        self.history = RedisChatMessageHistory(
-            session_id=session_id,
-            url=self.url,
-            ttl=1800  # 30 minutes
-        )
+        # Same list key RedisChatMessageHistory uses, so existing sessions stay readable
+        self.key = f"{_HISTORY_KEY_PREFIX}{session_id}"
+        self._history = None
         
-        # Dedicated client for metadata (Questions Set)
-        # RedisChatMessageHistory might not expose the client reliably
-        import redis
+        # Client for the message list and metadata (Questions Set), backed by the shared pool
         try:
-             self.redis_client = redis.from_url(self.url)
+             self.redis_client = redis.Redis(connection_pool=get_redis_pool())
         except Exception as e:
-             print(f"[ChatMemory] Failed to connect to Redis for metadata: {e}")
+             logger.warning("[ChatMemory] Failed to connect to Redis for metadata: %s", e)
              self.redis_client = None
 
+        # Open MULTI/EXEC pipeline while inside `pipeline()`; mutations queue onto it
+        self._pipe = None
+
+    @property
+    def history(self) -> RedisChatMessageHistory:
+        """LangChain view of the same list; only built by the no-client fallbacks."""
+        if self._history is None:
+            self._history = RedisChatMessageHistory(
+                session_id=self.session_id,
+                url=self.url,
+                key_prefix=_HISTORY_KEY_PREFIX,
+                ttl=HISTORY_TTL
+            )
+        return self._history
+
+    @contextmanager
+    def pipeline(self):
+        """
+        Batches every mutation made inside the block into one MULTI/EXEC round trip.
+        Nested blocks join the outermost pipeline.
+        """
+        if self._pipe is not None or not self.redis_client:
+            yield self
+            return
+
+        self._pipe = self.redis_client.pipeline(transaction=True)
+        try:
+            yield self
+            self._pipe.execute()
+        except Exception as e:
+            logger.warning("[Memory] Failed to write session %s: %s", self.session_id, e)
+        finally:
+            self._pipe = None
+
     def add_user_message(self, message: str):
-        self.history.add_user_message(message)
-        self._trim_history()
+        self._push_message(HumanMessage(content=message))
 
     def add_ai_message(self, message: str):
-        self.history.add_ai_message(message)
-        self._trim_history()
+        self._push_message(AIMessage(content=message))
+
+    def _push_message(self, message: BaseMessage):
+        """
+        Same layout as RedisChatMessageHistory (newest at the head of the list),
+        queued with the trim and TTL refresh so a message costs one round trip.
+        """
+        if not self.redis_client:
+            self.history.add_message(message)
+            return
 
-    def get_messages(self) -> List[BaseMessage]:
-        return self.history.messages
+        with self.pipeline():
+            key = self.key
+            self._pipe.lpush(key, json.dumps(message_to_dict(message)))
+            self._pipe.ltrim(key, 0, MAX_MESSAGES - 1)
+            self._pipe.expire(key, HISTORY_TTL)
+
+    def get_messages(self, limit: Optional[int] = None) -> List[BaseMessage]:
+        """
+        Chronological history. With `limit`, only the newest `limit` messages are
+        read (LRANGE on the newest-first list) and deserialized.
+        """
+        if not self.redis_client:
+            messages = self.history.messages
+            return messages[-limit:] if limit else messages
+
+        # Without a limit the range end is -1, i.e. the whole list
+        items = self.redis_client.lrange(self.key, 0, (limit or 0) - 1)
+        return messages_from_dict([json.loads(item) for item in reversed(items)])
 
     def get_last_ai_message(self) -> str:
         """
@@ -50,25 +123,6 @@ class ChatMemoryService:
                 return msg.content
         return None
 
-    def _trim_history(self):
-        """
-        Ensure only the last 5 messages are kept.
-        """
-        current_messages = self.history.messages
-        if len(current_messages) > 5:
-            # Simple approach: since we can't easily pop from complex serialized list without knowing format
-            # we rely on the implementation. 
-            # If we want to force it, we need to know the key.
-            # Langchain Redis History usually uses key `message_store:{session_id}`
-            try:
-                if self.redis_client:
-                    key = f"message_store:{self.session_id}"
-                    list_len = self.redis_client.llen(key)
-                    if list_len > 5:
-                         self.redis_client.lpop(key, list_len - 5)
-            except Exception as e:
-                print(f"[ChatMemoryService] Warning: Could not trim history: {e}")
-
     def add_question_to_session(self, question: str):
         """
         Adds a unique question to the session's question list (Newest First).
@@ -76,16 +130,17 @@ class ChatMemoryService:
         try:
             key = f"chat:session:{self.session_id}:questions_v2"
             if self.redis_client:
-                # Remove if exists first (to move it to top if repeated)
-                self.redis_client.lrem(key, 0, question.strip())
-                # Add to top (Left Push)
-                self.redis_client.lpush(key, question.strip())
-                # Maintain max size (optional, e.g. 50 items)
-                self.redis_client.ltrim(key, 0, 49)
-                self.redis_client.expire(key, 86400 * 7) 
-                print(f"[Memory] Saved question: {question}")
+                with self.pipeline():
+                    # Remove if exists first (to move it to top if repeated)
+                    self._pipe.lrem(key, 0, question.strip())
+                    # Add to top (Left Push)
+                    self._pipe.lpush(key, question.strip())
+                    # Maintain max size (optional, e.g. 50 items)
+                    self._pipe.ltrim(key, 0, 49)
+                    self._pipe.expire(key, 86400 * 7) 
+                logger.debug("[Memory] Saved question: %s", question)
         except Exception as e:
-             print(f"[Memory] Failed to save question: {e}")
+             logger.warning("[Memory] Failed to save question: %s", e)
 
     def get_session_questions(self) -> List[str]:
         """
@@ -99,11 +154,14 @@ class ChatMemoryService:
                 return [q.decode('utf-8') for q in questions]
             return []
         except Exception as e:
-            print(f"[Memory] Failed to get questions: {e}")
+            logger.warning("[Memory] Failed to get questions: %s", e)
             return []
 
     def clear(self):
-        self.history.clear()
+        if self.redis_client:
+            self.redis_client.delete(self.key)
+        else:
+            self.history.clear()
         try:
             key = f"chat:session:{self.session_id}:questions_v2"
             if self.redis_client:
@@ -114,18 +172,26 @@ class ChatMemoryService:
     def is_empty(self) -> bool:
         """Check if history is empty (needs hydration)."""
         try:
+            if self.redis_client:
+                return not self.redis_client.exists(self.key)
             return len(self.history.messages) == 0
         except:
             return True
 
     def hydrate_messages(self, messages: List[BaseMessage]):
         """Populate Redis history from DB list."""
-        self.history.clear() # Ensure clean state
-        for msg in messages:
-            if msg.type == "human":
-                self.history.add_user_message(msg.content)
-            elif msg.type == "ai":
-                self.history.add_ai_message(msg.content)
+        if not self.redis_client:
+            self.history.clear() # Ensure clean state
+            for msg in messages:
+                if msg.type in ("human", "ai"):
+                    self.history.add_message(msg)
+            return
+
+        with self.pipeline():
+            self._pipe.delete(self.key) # Ensure clean state
+            for msg in messages:
+                if msg.type in ("human", "ai"):
+                    self._push_message(msg)
                 
     def hydrate_questions(self, questions: List[str]):
         """Populate Questions List from DB list."""
@@ -148,7 +214,7 @@ class ChatMemoryService:
                 self.redis_client.rpush(key, *questions)
                 self.redis_client.expire(key, 86400 * 7)
         except Exception as e:
-            print(f"[Memory] Failed to hydrate questions: {e}")
+            logger.warning("[Memory] Failed to hydrate questions: %s", e)
     def set_session_data(self, key: str, value: Dict[str, Any]):
         """
         Stores arbitrary JSON-serializable data for the session.
@@ -157,10 +223,9 @@ class ChatMemoryService:
         try:
             redis_key = f"chat:session:{self.session_id}:context:{key}"
             if self.redis_client:
-                import json
                 self.redis_client.setex(redis_key, 3600, json.dumps(value)) # 1 hour TTL
         except Exception as e:
-            print(f"[Memory] Failed to set session data '{key}': {e}")
+            logger.warning("[Memory] Failed to set session data '%s': %s", key, e)
 
     def get_session_data(self, key: str) -> Dict[str, Any]:
         """
@@ -171,8 +236,7 @@ class ChatMemoryService:
             if self.redis_client:
                 data = self.redis_client.get(redis_key)
                 if data:
-                    import json
                     return json.loads(data)
         except Exception as e:
-            print(f"[Memory] Failed to get session data '{key}': {e}")
+            logger.warning("[Memory] Failed to get session data '%s': %s", key, e)
         return None
@@ -1,4 +1,5 @@
 
+import asyncio
 import os
 import sys
 import json
@@ -6,8 +7,11 @@ import time
 import base64
 import hashlib
 import re
+import httpx
+import redis
 import requests
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Any
 
 # LangChain Imports
 from langchain_ollama import ChatOllama
@@ -23,22 +27,23 @@ except ModuleNotFoundError:
 
 # Langfuse SDK - @observe decorator for LLM tracing
 # On Python 3.14+, Langfuse is disabled due to Pydantic v1 incompatibility
+from config import LANGFUSE_TRACING
 LANGFUSE_ENABLED = False
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator
 langfuse_client = None
 
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe, get_client
-        LANGFUSE_ENABLED = bool(os.getenv("LANGFUSE_PUBLIC_KEY") and os.getenv("LANGFUSE_SECRET_KEY"))
-        if LANGFUSE_ENABLED:
-            langfuse_client = get_client()
+        LANGFUSE_ENABLED = True
+        langfuse_client = get_client()
     except ImportError as e:
         print(f"[Langfuse] Import error: {e}")
 
 # Configuration (env-var fallbacks — DB values take priority at runtime)
 from config import LLM_PROVIDER, LLM_API_KEY, LLM_MODEL as OVERRIDE_MODEL
 from app.services.guardrails_service import get_guardrails, guardrails_enabled, extract_usage_from_metadata
+from app.services.chat_memory_service import get_redis_pool
 
 # Default to local Ollama instance
 OLLAMA_URL = os.getenv("OLLAMA_URL")
@@ -55,6 +60,19 @@ DEFAULT_MODELS = {
 
 MODEL_NAME = OVERRIDE_MODEL if OVERRIDE_MODEL else DEFAULT_MODELS.get(LLM_PROVIDER, "gpt-oss:120b-cloud")
 
+# Exact-match cache for deterministic (temperature 0) call_llm_json calls
+LLM_JSON_CACHE_TTL = 86400  # 24 hours
+LLM_JSON_CACHE_STATS = {"hits": 0, "misses": 0}
+_redis_client = None
+
+# Shared HTTP clients. get_llm builds a fresh ChatOpenAI per call (config is live),
+# but connections are pooled and kept alive across calls instead of a new TLS
+# handshake each time. Closed by shutdown() on app teardown.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+_http_client = None
+_async_http_client = None
+_http_session = None  # requests, for the direct Ollama title calls
+
 OUT_OF_SCOPE_REFUSAL_MESSAGE = (
     "I'm here for fitness, nutrition, and Feast Mode planning. I can't help with that topic, "
     "but let me know what health goal you'd like to tackle!"
@@ -74,6 +92,13 @@ GENERAL_KNOWLEDGE_PHRASES = (
 )
 
 MATH_EXPRESSION_PATTERN = re.compile(r"\b\d+\s*(?:[+\-*/xX]|plus|minus|times|divided by|over)\s*\d+\b", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+NEWLINES_PATTERN = re.compile(r"[\r\n]+")
+
+# _parse_json_from_text repairs: trailing commas, single-quoted keys
+TRAILING_COMMA_OBJECT_PATTERN = re.compile(r',\s*}')
+TRAILING_COMMA_ARRAY_PATTERN = re.compile(r',\s*]')
+SINGLE_QUOTED_KEY_PATTERN = re.compile(r"(?<=[{,\[])\s*'([^']+)'\s*:")
 
 # Titles returned by the model that we consider non-useful and should be replaced
 GENERIC_TITLE_SET = {
@@ -98,7 +123,7 @@ def _sanitize_model_title(raw_title: Optional[str]) -> str:
         cleaned = cleaned[6:].strip()
 
     cleaned = cleaned.strip('"\'\u201c\u201d')
-    cleaned = re.sub(r"\s+", " ", cleaned)
+    cleaned = WHITESPACE_PATTERN.sub(" ", cleaned)
 
     # Trim overly long titles
     if len(cleaned) > 50:
@@ -112,12 +137,12 @@ def _fallback_title_from_text(text: str) -> str:
     if not text:
         return "Chat Session"
 
-    cleaned = re.sub(r"[\r\n]+", " ", text).strip()
+    cleaned = NEWLINES_PATTERN.sub(" ", text).strip()
     if not cleaned:
         return "Chat Session"
 
     # Remove repeated whitespace and trim punctuation at the ends
-    cleaned = re.sub(r"\s+", " ", cleaned)
+    cleaned = WHITESPACE_PATTERN.sub(" ", cleaned)
     cleaned = cleaned.strip('"\'\u201c\u201d.,;:')
 
     words = cleaned.split()
@@ -242,7 +267,7 @@ if LANGFUSE_ENABLED:
 elif sys.version_info >= (3, 14):
     print("[Langfuse] Tracing disabled (Python 3.14+ - Pydantic v1 incompatibility)")
 else:
-    print("[Langfuse] Tracing disabled (missing credentials or import error)")
+    print("[Langfuse] Tracing disabled (missing credentials, LANGFUSE_ENABLED=0, or import error)")
 
 def get_llm(temperature: float = 0.7, max_tokens: int = 2000, json_mode: bool = False):
     """
@@ -299,7 +324,9 @@ def get_llm(temperature: float = 0.7, max_tokens: int = 2000, json_mode: bool =
             temperature=temperature,
             max_tokens=max_tokens,
             model_kwargs=model_kwargs,
-            timeout=60.0
+            timeout=60.0,
+            http_client=_get_http_client(),
+            http_async_client=_get_async_http_client(),
         )
 
     # 3. Fallback / Unknown
@@ -565,6 +592,70 @@ def _invoke_raw_llm(
     wall_start = time.time()
     llm = get_llm(temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
     response = llm.invoke(messages)
+    return _raw_response_content(response, wall_start, temperature, max_tokens, json_mode, cfg)
+
+
+async def _ainvoke_raw_llm(
+    messages: List,
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool,
+    cfg: dict,
+) -> Optional[str]:
+    wall_start = time.time()
+    llm = await asyncio.to_thread(get_llm, temperature, max_tokens, json_mode)
+    response = await llm.ainvoke(messages)
+    return _raw_response_content(response, wall_start, temperature, max_tokens, json_mode, cfg)
+
+
+@lru_cache(maxsize=32)
+def _gate_false_pattern(field: str) -> re.Pattern:
+    """Matches `"<field>": false` in streamed JSON; compiled once per field."""
+    return re.compile(rf'"{re.escape(field)}"\s*:\s*false')
+
+
+def _stream_raw_json(
+    messages: List,
+    temperature: float,
+    max_tokens: int,
+    stop_on_false: str,
+) -> Optional[str]:
+    """
+    json_mode raw call read as a stream. As soon as the model commits to
+    `"<stop_on_false>": false` the stream is closed and '{"<stop_on_false>": false}'
+    is returned, without waiting for (or paying for) the remaining fields.
+    """
+    wall_start = time.time()
+    stop_re = _gate_false_pattern(stop_on_false)
+    llm = get_llm(temperature=temperature, max_tokens=max_tokens, json_mode=True)
+    content = ""
+    stream = llm.stream(messages)
+    try:
+        for chunk in stream:
+            if not chunk.content:
+                continue
+            content += chunk.content
+            if stop_re.search(content):
+                print(f"[LLM Timing] '{stop_on_false}' is false; stream closed after {round((time.time() - wall_start) * 1000, 2)}ms")
+                return json.dumps({stop_on_false: False})
+    finally:
+        stream.close()
+
+    print(f"[LLM Timing] Streamed JSON response in {round((time.time() - wall_start) * 1000, 2)}ms")
+    if not content:
+        print("[LLM Service] Empty content received.")
+        return None
+    return content
+
+
+def _raw_response_content(
+    response: Any,
+    wall_start: float,
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool,
+    cfg: dict,
+) -> Optional[str]:
     wall_end = time.time()
     wall_clock_ms = round((wall_end - wall_start) * 1000, 2)
     content = response.content
@@ -602,8 +693,11 @@ def _call_guardrailed_or_raw(
     temperature: float,
     max_tokens: int,
     json_mode: bool,
+    cfg: Optional[dict] = None,
+    stop_on_false: Optional[str] = None,
 ) -> Optional[str]:
-    cfg = _get_db_llm_config()
+    if cfg is None:
+        cfg = _get_db_llm_config()
     lc_messages, rail_messages = _build_langchain_messages(system_prompt, user_prompt)
 
     # Skip out-of-scope detection for structured JSON generation prompts
@@ -627,20 +721,111 @@ def _call_guardrailed_or_raw(
     else:
         print("[LLM Service] Guardrails flag is OFF — calling raw LLM directly.")
 
+    if json_mode and stop_on_false:
+        return _stream_raw_json(lc_messages, temperature, max_tokens, stop_on_false)
     return _invoke_raw_llm(lc_messages, temperature, max_tokens, json_mode, cfg)
 
 
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(http2=True, limits=_HTTP_LIMITS, timeout=60.0)
+    return _http_client
+
+
+def _get_async_http_client() -> httpx.AsyncClient:
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=60.0)
+    return _async_http_client
+
+
+def _get_http_session() -> requests.Session:
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
+
+
+async def shutdown():
+    """Closes the shared HTTP clients (app teardown)."""
+    global _http_client, _async_http_client, _http_session
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+    if _http_session is not None:
+        _http_session.close()
+        _http_session = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        try:
+            _redis_client = redis.Redis(connection_pool=get_redis_pool())
+        except Exception as e:
+            print(f"[LLM Cache] Failed to connect to Redis: {e}")
+    return _redis_client
+
+
+def _llm_json_cache_key(cfg: dict, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+    """sha256 over the prompts plus everything that picks the model, so a settings change misses."""
+    payload = json.dumps({
+        "provider": cfg.get('llm_provider') or LLM_PROVIDER,
+        "model": cfg.get('llm_model') or OVERRIDE_MODEL or cfg.get('ollama_model') or MODEL_NAME,
+        "guardrails": guardrails_enabled(cfg),
+        "sys": system_prompt,
+        "usr": user_prompt,
+        "max_tokens": max_tokens,
+    }, sort_keys=True)
+    return "llm:json:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 @observe(name="call_llm_json", as_type="generation")
 def call_llm_json(
     system_prompt: str,
     user_prompt: str,
     temperature: float = 0.1,
     max_tokens: int = 20000,
+    stop_on_false: Optional[str] = None,
+    cache: bool = True,
 ) -> Optional[Dict[str, Any]]:
-    content = _call_guardrailed_or_raw(system_prompt, user_prompt, temperature, max_tokens, json_mode=True)
+    # stop_on_false: boolean gate field of a classifier schema. When the model answers
+    # false, the (raw) response stream is cut there and {stop_on_false: False} is returned.
+    # Deterministic calls are served verbatim from Redis when the same prompts were seen;
+    # cache=False is for callers that keep their own cache in front of this one.
+    cache_key = client = cfg = None
+    if temperature == 0 and cache:
+        cfg = _get_db_llm_config()
+        cache_key = _llm_json_cache_key(cfg, system_prompt, user_prompt, max_tokens)
+        client = _get_redis()
+        if client:
+            try:
+                cached = client.get(cache_key)
+                if cached:
+                    LLM_JSON_CACHE_STATS["hits"] += 1
+                    print(f"[LLM Cache] Exact hit ({LLM_JSON_CACHE_STATS['hits']} hits / {LLM_JSON_CACHE_STATS['misses']} misses)")
+                    return json.loads(cached)
+                LLM_JSON_CACHE_STATS["misses"] += 1
+            except Exception as e:
+                print(f"[LLM Cache] Redis lookup failed: {e}")
+
+    content = _call_guardrailed_or_raw(
+        system_prompt, user_prompt, temperature, max_tokens, json_mode=True, cfg=cfg, stop_on_false=stop_on_false
+    )
     if not content:
         return None
-    return _parse_json_from_text(content)
+    result = _parse_json_from_text(content)
+
+    if cache_key and client and result is not None:
+        try:
+            client.setex(cache_key, LLM_JSON_CACHE_TTL, json.dumps(result))
+        except Exception as e:
+            print(f"[LLM Cache] Redis store failed: {e}")
+    return result
 
 
 @observe(name="call_llm", as_type="generation")
@@ -653,6 +838,81 @@ def call_llm(
     return _call_guardrailed_or_raw(system_prompt, user_prompt, temperature, max_tokens, json_mode=False)
 
 
+@observe(name="call_llm", as_type="generation")
+async def call_llm_async(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int = 2000,
+) -> Optional[str]:
+    """
+    Awaitable variant of call_llm: the raw model call goes through the async client
+    (ainvoke) so concurrent requests keep progressing on the event loop. The guardrails
+    path and the DB config read stay synchronous and run in a worker thread.
+    """
+    heuristic_reason = _detect_out_of_scope_prompt(user_prompt)
+    if heuristic_reason:
+        print(
+            "[LLM Service] Pre-guardrail heuristic triggered; returning refusal.",
+            f"reason={heuristic_reason}"
+        )
+        return OUT_OF_SCOPE_REFUSAL_MESSAGE
+
+    cfg = await asyncio.to_thread(_get_db_llm_config)
+    lc_messages, rail_messages = _build_langchain_messages(system_prompt, user_prompt)
+
+    if guardrails_enabled(cfg):
+        print("[LLM Service] Guardrails flag is ON for this request.")
+        content = await asyncio.to_thread(_call_with_guardrails, rail_messages, temperature, max_tokens, False, cfg)
+        if content is not None:
+            print("[LLM Service] Guardrails satisfied request; raw LLM call skipped.")
+            return content
+        print("[LLM Service] Guardrails path returned None, falling back to raw LLM response.")
+    else:
+        print("[LLM Service] Guardrails flag is OFF — calling raw LLM directly.")
+
+    return await _ainvoke_raw_llm(lc_messages, temperature, max_tokens, False, cfg)
+
+
+async def call_llm_stream(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int = 2000,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of call_llm: yields text chunks as the model produces them.
+    The out-of-scope refusal and the guardrails path produce a complete answer
+    (rails check the whole output), which is yielded as a single chunk.
+    """
+    heuristic_reason = _detect_out_of_scope_prompt(user_prompt)
+    if heuristic_reason:
+        print(
+            "[LLM Service] Pre-guardrail heuristic triggered; returning refusal.",
+            f"reason={heuristic_reason}"
+        )
+        yield OUT_OF_SCOPE_REFUSAL_MESSAGE
+        return
+
+    cfg = await asyncio.to_thread(_get_db_llm_config)
+    if guardrails_enabled(cfg):
+        content = await asyncio.to_thread(
+            _call_guardrailed_or_raw, system_prompt, user_prompt, temperature, max_tokens, False
+        )
+        if content:
+            yield content
+        return
+
+    print("[LLM Service] Guardrails flag is OFF — streaming raw LLM directly.")
+    lc_messages, _ = _build_langchain_messages(system_prompt, user_prompt)
+    wall_start = time.time()
+    llm = await asyncio.to_thread(get_llm, temperature, max_tokens)
+    async for chunk in llm.astream(lc_messages):
+        if chunk.content:
+            yield chunk.content
+    print(f"[LLM Timing] Streamed response in {round((time.time() - wall_start) * 1000, 2)}ms")
+
+
 def _generate_title_direct_ollama(first_message: str) -> str:
     """
     Generate title using direct Ollama API call for remote models.
@@ -686,7 +946,7 @@ Title:"""
             }
         }
         
-        response = requests.post(
+        response = _get_http_session().post(
             f"{live_url}/api/generate",
             json=payload,
             timeout=60  # Increased from 30 to 60 seconds
@@ -792,7 +1052,7 @@ Title:"""
             }
         }
         
-        response = requests.post(
+        response = _get_http_session().post(
             f"{live_url}/api/generate",
             json=payload,
             timeout=60  # Increased from 30 to 60 seconds
@@ -898,7 +1158,7 @@ Title:"""
             }
         }
         
-        response = requests.post(
+        response = _get_http_session().post(
             f"{live_url}/api/generate",
             json=payload,
             timeout=60  # Increased from 30 to 60 seconds
@@ -987,8 +1247,6 @@ def _parse_json_from_text(text: str) -> Optional[Dict]:
     """
     Robust JSON parser kept from original service.
     """
-    import re
-    
     cleaned_text = text.strip()
     
     # 1. Strip Markdown Code Blocks
@@ -1014,10 +1272,10 @@ def _parse_json_from_text(text: str) -> Optional[Dict]:
     
     # Repair Strategies (Simplified from original for brevity, but kept logic)
     repaired_text = cleaned_text
-    repaired_text = re.sub(r',\s*}', '}', repaired_text)
-    repaired_text = re.sub(r',\s*]', ']', repaired_text)
+    repaired_text = TRAILING_COMMA_OBJECT_PATTERN.sub('}', repaired_text)
+    repaired_text = TRAILING_COMMA_ARRAY_PATTERN.sub(']', repaired_text)
     # Quotes
-    repaired_text = re.sub(r"(?<=[{,\[])\s*'([^']+)'\s*:", r'"\1":', repaired_text)
+    repaired_text = SINGLE_QUOTED_KEY_PATTERN.sub(r'"\1":', repaired_text)
     
     try:
         return json.loads(repaired_text)
@@ -1,5 +1,6 @@
 
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -148,3 +149,112 @@ def calculate_daily_targets(
         "carbs": round(carbs, 1)
     }
 
+
+
+# --- BATCH (VECTORIZED) VARIANT ---
+# Integer codes for the string inputs, resolved once per row at the boundary
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'extra_active': 1.9
+}
+GOAL_CODES = {'maintenance': 0, 'weight_loss': 1, 'fat_loss': 2, 'muscle_gain': 3}
+_GOAL_MAINTENANCE, _GOAL_WEIGHT_LOSS, _GOAL_FAT_LOSS, _GOAL_MUSCLE_GAIN = 0, 1, 2, 3
+
+
+def _round1(values):
+    """
+    np.round(x, 1) scales by 10 first, so it can disagree with round(x, 1) on
+    values sitting next to a .x5 boundary. Redo just those with round() so batch
+    results match the scalar path exactly.
+    """
+    scaled = values * 10
+    rounded = np.round(scaled) / 10
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(float(v), 1) for v in values[near_half]]
+    return rounded
+
+
+def calculate_daily_targets_batch(
+    weight,
+    height,
+    age,
+    gender,
+    activity_level,
+    fitness_goal,
+    diet_type,
+    weight_goal
+) -> dict:
+    """
+    Array version of calculate_daily_targets for bulk recomputes.
+    Takes equal-length sequences (callers apply the same age/gender defaults and
+    skip rows without weight/height) and runs every step as NumPy array ops,
+    following the scalar function branch for branch.
+    
+    Returns:
+        dict: { "calories": ndarray, "protein": ndarray, "fat": ndarray, "carbs": ndarray }
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    weight_goal = np.array([wg if wg else np.nan for wg in weight_goal], dtype=np.float64)
+
+    activity_level = [(a or 'sedentary').lower() for a in activity_level]
+    is_male = np.array([g.lower() == 'male' for g in gender])
+    multiplier = np.array([ACTIVITY_MULTIPLIERS.get(a, 1.2) for a in activity_level])
+    is_active = np.array([a in ('active', 'extra_active') for a in activity_level])
+    goal = np.array([GOAL_CODES.get((g or 'maintenance').lower(), _GOAL_MAINTENANCE) for g in fitness_goal])
+    is_veg = np.array([(d or 'non_veg').lower() == 'veg' for d in diet_type])
+
+    # 1-2. BMR (Mifflin-St Jeor) and TDEE
+    bmr = (10 * weight) + (6.25 * height) - (5 * age) + np.where(is_male, 5, -161)
+    maintenance_calories = bmr * multiplier
+
+    # 3. Goal adjustment (NaN weight_goal compares False, like a missing goal)
+    goal = np.where((goal == _GOAL_MUSCLE_GAIN) & (weight > weight_goal), _GOAL_FAT_LOSS, goal)
+    is_loss = (goal == _GOAL_WEIGHT_LOSS) | (goal == _GOAL_FAT_LOSS)
+    target_calories = np.select(
+        [goal == _GOAL_WEIGHT_LOSS, goal == _GOAL_FAT_LOSS, goal == _GOAL_MUSCLE_GAIN],
+        [
+            np.maximum(maintenance_calories - 750, bmr * 1.1),
+            np.maximum(maintenance_calories - 500, bmr * 1.1),
+            maintenance_calories + 300,
+        ],
+        default=maintenance_calories
+    )
+
+    # 4. Protein
+    protein_per_kg = np.where(
+        is_loss | (goal == _GOAL_MUSCLE_GAIN),
+        np.where(is_active, 1.8, 1.6),
+        np.where(is_active, 1.4, 1.2)
+    )
+    protein_per_kg = np.where(is_veg, np.minimum(protein_per_kg * 1.1, 2.0), protein_per_kg)
+    protein = _round1(weight * protein_per_kg)
+    protein_calories = protein * 4
+
+    # 5-6. Fat, then carbs from the remainder
+    fat = _round1((target_calories * np.where(is_loss, 0.30, 0.35)) / 9)
+    carbs = np.maximum(_round1((target_calories - protein_calories - fat * 9) / 4), 0)
+
+    # 7. Minimum carbs: trade fat down to 20% (floor 0.5g/kg), then force 130g
+    target_fat = (target_calories * 0.20) / 9
+    lower_fat = (carbs < 130) & (target_fat < fat)
+    fat = np.where(lower_fat, np.maximum(target_fat, weight * 0.5), fat)
+    carbs = np.where(
+        lower_fat,
+        np.maximum(_round1((target_calories - protein_calories - fat * 9) / 4), 0),
+        carbs
+    )
+    carbs = np.maximum(carbs, 130)
+
+    # 8. Final Rounding
+    return {
+        "calories": np.round(target_calories),
+        "protein": _round1(protein),
+        "fat": _round1(fat),
+        "carbs": _round1(carbs)
+    }
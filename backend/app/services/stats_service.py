@@ -11,6 +11,36 @@ from app.models.exercise import Exercise
 from app.models.tracking import FoodLog, WorkoutLog
 from sqlalchemy import func
 from datetime import datetime, date, timedelta
+from app.services.chat_memory_service import get_redis_pool
+import json
+import redis
+
+# get_full_user_context is cached per user for follow-up chat turns; logging endpoints
+# (and coach-applied changes) drop the entry, the TTL bounds anything else that mutates it.
+USER_CONTEXT_CACHE_TTL = 60  # seconds
+
+_redis_client = None
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        try:
+            _redis_client = redis.Redis(connection_pool=get_redis_pool())
+        except Exception as e:
+            print(f"[StatsService] Failed to connect to Redis for context cache: {e}")
+    return _redis_client
+
+def _user_context_key(user_id: int) -> str:
+    return f"user_ctx:{user_id}"
+
+def invalidate_user_context(user_id: int):
+    """Drops the cached full user context (call after the user's logs or plans change)."""
+    try:
+        client = _get_redis()
+        if client:
+            client.delete(_user_context_key(user_id))
+    except Exception as e:
+        print(f"[StatsService] Context cache invalidation failed for user {user_id}: {e}")
 
 class StatsService:
     """
@@ -255,6 +285,29 @@ class StatsService:
             "progress": self.get_user_progress(user_id)
         }
 
+    def get_full_user_context_cached(self, user_id: int) -> Dict[str, Any]:
+        """
+        get_full_user_context through a short-lived Redis cache.
+        Values round-trip through JSON (dates come back as their str() form, which is how the prompt renders them).
+        """
+        client = _get_redis()
+        key = _user_context_key(user_id)
+        try:
+            if client:
+                cached = client.get(key)
+                if cached:
+                    return json.loads(cached)
+        except Exception as e:
+            print(f"[StatsService] Context cache read failed: {e}")
+
+        context = self.get_full_user_context(user_id)
+        try:
+            if client and context:
+                client.setex(key, USER_CONTEXT_CACHE_TTL, json.dumps(context, default=str))
+        except Exception as e:
+            print(f"[StatsService] Context cache write failed: {e}")
+        return context
+
     def cleanup_old_logs(self, user_id: int):
         """
         Maintenance: Remove workout logs older than 7 days.
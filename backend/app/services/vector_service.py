@@ -1,7 +1,10 @@
 
 import os
-from typing import List, Dict, Any, Optional
+import uuid
+from datetime import date
+from typing import List, Dict, Any, Optional, Tuple
 from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, FieldCondition, Filter, MatchValue, PointStruct, VectorParams
 # from sentence_transformers import SentenceTransformer # REMOVED: Causing environmental issues
 from langchain_ollama import OllamaEmbeddings
 from config import QDRANT_URL, QDRANT_API_KEY
@@ -10,6 +13,14 @@ from config import QDRANT_URL, QDRANT_API_KEY
 DEFAULT_EMBED_MODEL = "all-minilm" 
 # NOTE: Ensure you have run `ollama pull all-minilm` 
 
+# Semantic cache for intent-classifier LLM responses (see search_intent_cache)
+INTENT_CACHE_COLLECTION = "llm_intent_cache"
+INTENT_CACHE_THRESHOLD = 0.95
+
+# Semantic cache for coach answers (see search_response_cache)
+RESPONSE_CACHE_COLLECTION = "llm_response_cache"
+RESPONSE_CACHE_THRESHOLD = 0.95
+
 class VectorService:
     """
     The Librarian: Handles interactions with the Qdrant vector database
@@ -89,3 +100,167 @@ class VectorService:
         except Exception as e:
             print(f"[VectorService] Error searching exercises: {e}")
             return []
+
+    def _intent_cache_filter(self, prompt_version: str, today: date, match: bool = True, slot_key: Optional[str] = None) -> Filter:
+        conditions = [
+            FieldCondition(key="prompt_version", match=MatchValue(value=prompt_version)),
+            FieldCondition(key="date_bucket", match=MatchValue(value=today.isoformat())),
+        ]
+        if not match:
+            return Filter(must=conditions[:1], must_not=conditions[1:])
+        if slot_key is not None:
+            conditions.append(FieldCondition(key="slot_key", match=MatchValue(value=slot_key)))
+        return Filter(must=conditions)
+
+    def search_intent_cache(self, prompt_version: str, message: str, slot_key: str, threshold: float = INTENT_CACHE_THRESHOLD) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look up a cached intent-classifier response for a near-identical message.
+        Only entries for the same prompt version and the same day match, since the
+        classifiers resolve relative dates ("yesterday") against today; slot_key must
+        match too, so messages that differ only in a value the classifier extracts
+        ("last Tuesday" vs "last Wednesday") don't share an answer.
+        Returns (response_json or None, query_vector) so a miss can reuse the vector in store_intent_cache.
+        """
+        if not self.client:
+            return None, None
+
+        try:
+            query_vector = self.embeddings.embed_query(message.strip().lower())
+            if not self.client.collection_exists(INTENT_CACHE_COLLECTION):
+                return None, query_vector
+
+            results = self.client.query_points(
+                collection_name=INTENT_CACHE_COLLECTION,
+                query=query_vector,
+                query_filter=self._intent_cache_filter(prompt_version, date.today(), slot_key=slot_key),
+                limit=1,
+                score_threshold=threshold,
+                with_payload=True
+            ).points
+            if results:
+                return results[0].payload.get("response_json"), query_vector
+            return None, query_vector
+        except Exception as e:
+            print(f"[VectorService] Error searching intent cache: {e}")
+            return None, None
+
+    def store_intent_cache(self, prompt_version: str, message: str, slot_key: str, response: Dict[str, Any], query_vector: Optional[List[float]] = None):
+        """
+        Cache an intent-classifier response under today's date bucket.
+        Entries from earlier days for the same prompt version are dropped on write.
+        """
+        if not self.client:
+            return
+
+        try:
+            normalized = message.strip().lower()
+            vector = query_vector or self.embeddings.embed_query(normalized)
+            if not self.client.collection_exists(INTENT_CACHE_COLLECTION):
+                self.client.create_collection(
+                    collection_name=INTENT_CACHE_COLLECTION,
+                    vectors_config=VectorParams(size=len(vector), distance=Distance.COSINE)
+                )
+
+            today = date.today()
+            self.client.delete(
+                collection_name=INTENT_CACHE_COLLECTION,
+                points_selector=self._intent_cache_filter(prompt_version, today, match=False)
+            )
+            # Deterministic id: re-storing the same message overwrites instead of duplicating
+            point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{prompt_version}|{today.isoformat()}|{normalized}"))
+            self.client.upsert(
+                collection_name=INTENT_CACHE_COLLECTION,
+                points=[PointStruct(
+                    id=point_id,
+                    vector=vector,
+                    payload={
+                        "prompt_version": prompt_version,
+                        "date_bucket": today.isoformat(),
+                        "slot_key": slot_key,
+                        "response_json": response
+                    }
+                )]
+            )
+        except Exception as e:
+            print(f"[VectorService] Error storing intent cache: {e}")
+
+    def _response_cache_filter(self, user_id: int, context_key: str, match: bool = True, slot_key: Optional[str] = None) -> Filter:
+        user_cond = FieldCondition(key="user_id", match=MatchValue(value=user_id))
+        context_cond = FieldCondition(key="context_key", match=MatchValue(value=context_key))
+        if not match:
+            return Filter(must=[user_cond], must_not=[context_cond])
+        conditions = [user_cond, context_cond]
+        if slot_key is not None:
+            conditions.append(FieldCondition(key="slot_key", match=MatchValue(value=slot_key)))
+        return Filter(must=conditions)
+
+    def search_response_cache(self, user_id: int, context_key: str, message: str, slot_key: str, threshold: float = RESPONSE_CACHE_THRESHOLD) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look up a cached coach answer to a near-identical question from the same user.
+        context_key fingerprints the user context the answer was generated from, so any
+        change to plans, logs or profile makes earlier answers unreachable; slot_key must
+        match too, so "protein in my lunch" never answers "protein in my dinner".
+        Returns ({"content", "source"} or None, query_vector) so a miss can reuse the vector in store_response_cache.
+        """
+        if not self.client:
+            return None, None
+
+        try:
+            query_vector = self.embeddings.embed_query(message.strip().lower())
+            if not self.client.collection_exists(RESPONSE_CACHE_COLLECTION):
+                return None, query_vector
+
+            results = self.client.query_points(
+                collection_name=RESPONSE_CACHE_COLLECTION,
+                query=query_vector,
+                query_filter=self._response_cache_filter(user_id, context_key, slot_key=slot_key),
+                limit=1,
+                score_threshold=threshold,
+                with_payload=True
+            ).points
+            if results:
+                payload = results[0].payload
+                return {"content": payload.get("content"), "source": payload.get("source")}, query_vector
+            return None, query_vector
+        except Exception as e:
+            print(f"[VectorService] Error searching response cache: {e}")
+            return None, None
+
+    def store_response_cache(self, user_id: int, context_key: str, message: str, slot_key: str, content: str, source: str, query_vector: Optional[List[float]] = None):
+        """
+        Cache a coach answer for this user under the current context_key.
+        The user's entries for any other context_key are stale and dropped on write.
+        """
+        if not self.client:
+            return
+
+        try:
+            normalized = message.strip().lower()
+            vector = query_vector or self.embeddings.embed_query(normalized)
+            if not self.client.collection_exists(RESPONSE_CACHE_COLLECTION):
+                self.client.create_collection(
+                    collection_name=RESPONSE_CACHE_COLLECTION,
+                    vectors_config=VectorParams(size=len(vector), distance=Distance.COSINE)
+                )
+
+            self.client.delete(
+                collection_name=RESPONSE_CACHE_COLLECTION,
+                points_selector=self._response_cache_filter(user_id, context_key, match=False)
+            )
+            point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{user_id}|{context_key}|{normalized}"))
+            self.client.upsert(
+                collection_name=RESPONSE_CACHE_COLLECTION,
+                points=[PointStruct(
+                    id=point_id,
+                    vector=vector,
+                    payload={
+                        "user_id": user_id,
+                        "context_key": context_key,
+                        "slot_key": slot_key,
+                        "content": content,
+                        "source": source
+                    }
+                )]
+            )
+        except Exception as e:
+            print(f"[VectorService] Error storing response cache: {e}")
@@ -8,9 +8,11 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from datetime import date
 
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator fallback
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
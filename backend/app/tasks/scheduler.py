@@ -11,9 +11,11 @@ import sys
 
 logger = logging.getLogger(__name__)
 
+from config import LANGFUSE_TRACING
+
 # Langfuse tracing
 observe = lambda *args, **kwargs: (lambda f: f)  # No-op decorator fallback
-if sys.version_info < (3, 14):
+if LANGFUSE_TRACING and sys.version_info < (3, 14):
     try:
         from langfuse import observe
     except ImportError:
@@ -149,6 +151,44 @@ def generate_daily_plans_scheduler():
     finally:
         db.close()
 
+@celery_app.task
+def refresh_user_ages():
+    """
+    Beat task: Runs daily.
+    users.age is stored (read on every nutrition recalculation) and only set on dob
+    writes, so roll it over for users whose birthday has passed in one UPDATE, then
+    recompute those users' profile macros, which depend on age.
+    """
+    from sqlalchemy import Integer, cast, func, select, update
+    from app.models.user import User
+    from app.models.user_profile import bulk_recompute_nutrition
+    from app.services.stats_service import invalidate_user_context
+
+    db: Session = SessionLocal()
+    try:
+        current_age = cast(func.date_part('year', func.age(func.current_date(), User.dob)), Integer)
+        user_ids = db.execute(
+            update(User)
+            .where(User.dob.isnot(None), User.age.is_distinct_from(current_age))
+            .values(age=current_age)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        recomputed = 0
+        if user_ids:
+            profile_ids = db.execute(
+                select(UserProfile.id).where(UserProfile.user_id.in_(user_ids))
+            ).scalars().all()
+            recomputed = bulk_recompute_nutrition(db, profile_ids)
+        db.commit()
+
+        for user_id in user_ids:
+            invalidate_user_context(user_id)
+        logger.info(f"Age refresh ran. Updated {len(user_ids)} users, recomputed {recomputed} profiles.")
+    finally:
+        db.close()
+
 # --- SCHEDULE CONFIG ---
 from celery.schedules import crontab
 
@@ -157,4 +197,8 @@ celery_app.conf.beat_schedule = {
         'task': 'app.tasks.scheduler.generate_daily_plans_scheduler',
         'schedule': crontab(minute=00)  # Run at top of every hour
     },
+    'refresh-user-ages-daily': {
+        'task': 'app.tasks.scheduler.refresh_user_ages',
+        'schedule': crontab(hour=0, minute=5)  # Shortly after midnight UTC
+    },
 }
@@ -62,6 +62,10 @@ def generate_workout_plan_async(self, request_data_dict: dict):
                 "error": "Failed to generate workout plan"
             }
         
+        # The coach's cached context still holds the old plan
+        from app.services.stats_service import invalidate_user_context
+        invalidate_user_context(request_data.user_id)
+        
         # Convert to dict for JSON serialization
         from app.schemas.workout_plan import WorkoutPlanResponse
         plan_dict = WorkoutPlanResponse.from_orm(plan).dict()
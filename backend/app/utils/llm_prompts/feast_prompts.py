@@ -59,9 +59,9 @@ Output JSON:
 }
 """
 
+# Event details go last so the instructions stay a constant prefix (provider prompt caching)
 FEAST_CONFIRMATION_PROMPT = """
 Analyze the user's response to a Feast Mode proposal.
-Context: We proposed banking calories for "{event_name}" on "{event_date}".
 
 Possible Intents:
 1. CONFIRM: User agrees ("Yes", "Do it", "Sounds good")
@@ -75,4 +75,6 @@ Output JSON:
   "skip_workout": boolean,
   "reason": "optional reason"
 }}
+
+Context: We proposed banking calories for "{event_name}" on "{event_date}".
 """
@@ -1,7 +1,7 @@
 from argon2 import PasswordHasher
 from jose import JWTError,jwt
 from argon2.exceptions import VerifyMismatchError
-from datetime import datetime,timedelta,timezone
+from datetime import date,datetime,timedelta,timezone
 from config import SECRET_KEY,ALGORITHM
 
 # Argon2 password hasher (OWASP recommended)
@@ -33,3 +33,9 @@ def create_access_token(data: dict):
     expire = datetime.now(timezone.utc) + timedelta(minutes=1440)
     to_encode.update({'exp':expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+# Age Logic
+def compute_age(dob: date, today: date = None) -> int:
+    """Whole years since dob. Pass `today` to reuse one date across a batch."""
+    today = today or date.today()
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
@@ -22,6 +22,14 @@ QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 USDA_API_KEY = os.getenv("USDA_API_KEY")
 
+# Langfuse tracing: on when credentials are set, unless LANGFUSE_ENABLED=0.
+# Off means @observe is a plain no-op and the langfuse SDK is never imported.
+LANGFUSE_TRACING = bool(
+    os.getenv("LANGFUSE_PUBLIC_KEY")
+    and os.getenv("LANGFUSE_SECRET_KEY")
+    and os.getenv("LANGFUSE_ENABLED", "1") != "0"
+)
+
 print("--- CONFIG DEBUG ---")
 print(f"QDRANT_URL: '{QDRANT_URL}'")
 print(f"REDIS_URL: '{REDIS_URL}'")
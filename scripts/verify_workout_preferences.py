@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, selectinload
 import sys, os; from pathlib import Path; sys.path.insert(0, str([p for p in Path(__file__).resolve().parents if (p / 'backend').exists()][0] / 'backend')) # modified
 
 from app.database import Base, SQLALCHEMY_DATABASE_URL
@@ -66,7 +66,10 @@ def verify_workout_preferences():
 
     # 4. Verify Relationship from Profile
     print("Verifying relationship from UserProfile -> WorkoutPreferences...")
-    db.refresh(profile)
+    # workout_preferences is raise_on_sql, so load it explicitly
+    profile = db.query(UserProfile).options(
+        selectinload(UserProfile.workout_preferences)
+    ).filter(UserProfile.id == profile.id).populate_existing().first()
     if profile.workout_preferences:
         print(f"Success! Profile has preferences: {profile.workout_preferences.experience_level}")
     else: